@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare mouth-cropping throughput: a fresh FaceMesh per frame (crop_mouth_roi)
+versus one persistent tracking-mode MouthCropper, on the same clips.
+
+Frames are decoded into memory first so only the cropping is timed.
+
+Usage:
+  python scripts/bench_crop.py --paths config/paths.yaml --clips 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lipgans.config import Config
+from lipgans.data.crop_mouth import MouthCropper, crop_mouth_roi
+
+
+def _load_clips(root: Path, limit: int):
+    clips = []
+    for clip_path in sorted(root.glob("*/*.mp4"))[:limit]:
+        cap = cv2.VideoCapture(str(clip_path))
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            clips.append(frames)
+    return clips
+
+
+def _bench(name, clips, crop_clip):
+    n = sum(len(c) for c in clips)
+    t0 = time.perf_counter()
+    missed = sum(crop_clip(c) for c in clips)
+    dt = time.perf_counter() - t0
+    print(f"{name:<28} {n:6d} frames  {dt:7.2f}s  {n / dt:8.1f} frames/s  no-face={missed}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--clips", type=int, default=20, help="Number of viseme clips to benchmark on")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    clips = _load_clips(cfg.paths.viseme_clips_dir, args.clips)
+    if not clips:
+        print(f"[ERROR] No .mp4 clips found under {cfg.paths.viseme_clips_dir}")
+        return
+
+    _bench("per-frame FaceMesh (old)", clips,
+           lambda frames: sum(crop_mouth_roi(f) is None for f in frames))
+
+    with MouthCropper() as cropper:
+        def _tracked(frames):
+            cropper.reset()
+            return sum(cropper.crop(f) is None for f in frames)
+        _bench("persistent MouthCropper", clips, _tracked)
+
+
+if __name__ == "__main__":
+    main()
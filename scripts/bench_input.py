@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Measure input-pipeline throughput (clips/s) for one viseme class: the previous
+from_generator + PIL loader versus the native tf.data pipeline (and the
+memory-mapped cache when OUTPUT.cache_dir is set). No model runs; batches are
+only pulled through the pipeline.
+
+Usage:
+  python scripts/bench_input.py --paths config/paths.yaml --viseme 03_Open_Mouth --epochs 3
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import tensorflow as tf
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lipgans.config import Config
+from lipgans.data.dataset import _clip_dirs, _generator_dataset, make_dataset
+
+
+def _bench(name, ds, epochs):
+    for _ in ds.take(1):  # warm-up: tracing, thread pools, cache compile
+        pass
+    clips, t0 = 0, time.perf_counter()
+    for _ in range(epochs):
+        for batch in ds:
+            clips += int(batch.shape[0])
+    dt = time.perf_counter() - t0
+    print(f"{name:<22} {clips:7d} clips  {dt:7.2f}s  {clips / dt:9.1f} clips/s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--viseme", required=True, help="Viseme class directory under cropped_dir")
+    ap.add_argument("--epochs", type=int, default=3, help="Passes over the class per pipeline")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    t = cfg.train
+    img_size = tuple(t.img_size)
+    clip_dirs = _clip_dirs(Path(cfg.paths.cropped_dir) / args.viseme)
+
+    legacy = _generator_dataset(clip_dirs, t.target_frames, img_size).batch(t.batch_size).prefetch(tf.data.AUTOTUNE)
+    _bench("generator (old)", legacy, args.epochs)
+    _bench("native tf.data", make_dataset(cfg.paths.cropped_dir, args.viseme, t.batch_size,
+                                          t.target_frames, img_size), args.epochs)
+    if cfg.paths.cache_dir is not None:
+        _bench("mmap cache", make_dataset(cfg.paths.cropped_dir, args.viseme, t.batch_size,
+                                          t.target_frames, img_size, cache_dir=cfg.paths.cache_dir), args.epochs)
+
+
+if __name__ == "__main__":
+    main()
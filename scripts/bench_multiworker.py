@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Scaling report for multi-worker data-parallel training (MultiWorkerMirroredStrategy).
+
+For each worker count, launches that many local training processes with a TF_CONFIG
+cluster on localhost ports, each pinned to its own share of the CPU cores, trains
+one viseme class for a few short epochs and reads the chief's telemetry. Every
+worker keeps TRAINING.batch_size clips per step, so the global batch grows with the
+worker count. The first epoch (tracing, collective setup) is left out.
+
+Local processes stand in for nodes: the report shows the synchronisation overhead
+of the all-reduce on this machine; on a real cluster, set TF_CONFIG on every node
+and run scripts/train_all.py there instead.
+
+Usage:
+  python scripts/bench_multiworker.py --paths config/paths.yaml --viseme 03_Open_Mouth
+  python scripts/bench_multiworker.py --paths config/paths.yaml --viseme 03_Open_Mouth --workers 1 2 4 --steps 20
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+def _free_ports(n: int) -> list:
+    socks = [socket.socket() for _ in range(n)]
+    for s in socks:
+        s.bind(("localhost", 0))
+    ports = [s.getsockname()[1] for s in socks]
+    for s in socks:
+        s.close()
+    return ports
+
+
+def _worker(args):
+    """One training process of the cluster described by TF_CONFIG (set by the launcher)."""
+    cores = json.loads(args.cores)
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(max(1, len(cores)))
+
+    import tensorflow as tf
+    from lipgans.config import Config
+    from lipgans.train.train_viseme import train_one_class
+
+    tf.config.threading.set_intra_op_parallelism_threads(max(1, len(cores)))
+    cfg = Config.load(args.paths)
+    cfg.paths.models_root = Path(args.out)
+    cfg.train.epochs = args.epochs
+    cfg.quality.enabled = False
+    cfg.checkpoint.every_epochs = args.epochs
+    cfg.checkpoint.export_generator = False
+    cfg.telemetry.enabled, cfg.telemetry.jsonl, cfg.telemetry.tensorboard = True, True, False
+    cfg.telemetry.log_dir = Path(args.out) / "logs"
+    cfg.telemetry.profile_steps = 0
+    train_one_class(cfg, args.viseme, max_batches=args.steps)
+
+
+def _launch(args, n: int, cpus: list, root: Path) -> dict:
+    out = root / f"workers_{n}"
+    out.mkdir(parents=True)
+    share = max(1, len(cpus) // n)
+    ports = _free_ports(n) if n > 1 else []
+    procs = []
+    for i in range(n):
+        env = dict(os.environ)
+        env.pop("TF_CONFIG", None)
+        if n > 1:
+            env["TF_CONFIG"] = json.dumps({"cluster": {"worker": [f"localhost:{p}" for p in ports]},
+                                           "task": {"type": "worker", "index": i}})
+        cores = cpus[i * share:(i + 1) * share] or cpus[i % len(cpus):i % len(cpus) + 1]
+        cmd = [sys.executable, __file__, "--paths", args.paths, "--viseme", args.viseme,
+               "--steps", str(args.steps), "--epochs", str(args.epochs),
+               "--_worker", "--out", str(out), "--cores", json.dumps(cores)]
+        log = open(out / f"worker_{i}.log", "w")
+        procs.append((subprocess.Popen(cmd, env=env, stdout=log, stderr=subprocess.STDOUT), log))
+
+    t0 = time.perf_counter()
+    failed = False
+    for p, log in procs:
+        try:
+            failed |= p.wait(timeout=max(1.0, args.timeout - (time.perf_counter() - t0))) != 0
+        except subprocess.TimeoutExpired:
+            failed = True
+        log.close()
+    for p, _ in procs:
+        if p.poll() is None:
+            p.kill()
+    if failed:
+        tail = (out / "worker_0.log").read_text(encoding="utf-8", errors="replace").splitlines()[-5:]
+        raise RuntimeError("worker failed or timed out:\n  " + "\n  ".join(tail))
+
+    epochs = [json.loads(line) for line in (out / "logs" / f"{args.viseme}.jsonl").read_text().splitlines()]
+    epochs = [r for r in epochs if r["type"] == "epoch"][1:]  # skip the warm-up epoch
+    if not epochs:
+        raise RuntimeError("no timed epochs (use --epochs 2 or more)")
+    wall = sum(r["epoch_s"] for r in epochs)
+    clips = sum(r["clips"] for r in epochs)
+    steps = sum(r["steps"] for r in epochs)
+    return dict(workers=n, cores=share, steps_per_s=steps / wall, clips_per_s=clips / wall,
+                step_ms=1e3 * wall / max(steps, 1))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--viseme", default="03_Open_Mouth", help="Viseme class to train")
+    ap.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4], help="Worker counts to compare")
+    ap.add_argument("--steps", type=int, default=20, help="Max train steps per epoch")
+    ap.add_argument("--epochs", type=int, default=3, help="Epochs per run (the first is not timed)")
+    ap.add_argument("--timeout", type=float, default=1800, help="Seconds before a run is abandoned")
+    ap.add_argument("--_worker", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help=argparse.SUPPRESS)
+    ap.add_argument("--cores", default="[]", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._worker:
+        _worker(args)
+        return
+
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    print(f"[INFO] {args.viseme}: {args.steps} steps/epoch, {args.epochs} epochs, {len(cpus)} CPU cores")
+    if max(args.workers) > len(cpus):
+        print(f"⚠️ More workers than CPU cores: workers will share cores, so larger runs measure "
+              f"oversubscription rather than scaling")
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="lipgans_multiworker_") as tmp:
+        for n in args.workers:
+            print(f"[INFO] Running {n} worker(s)...")
+            try:
+                rows.append(_launch(args, n, cpus, Path(tmp)))
+            except Exception as e:
+                print(f"❌ {n} worker(s): {e}")
+
+    if not rows:
+        return
+    base = rows[0]["clips_per_s"] / rows[0]["workers"]  # per-worker throughput of the first run
+    print(f"{'workers':>7} {'cores/w':>7} {'step ms':>9} {'steps/s':>8} {'clips/s':>9} {'speedup':>8} {'effic.':>7}")
+    for r in rows:
+        speedup = r["clips_per_s"] / base
+        print(f"{r['workers']:>7} {r['cores']:>7} {r['step_ms']:>9.1f} {r['steps_per_s']:>8.2f} "
+              f"{r['clips_per_s']:>9.1f} {speedup:>7.2f}x {100 * speedup / r['workers']:>6.0f}%")
+
+
+if __name__ == "__main__":
+    main()
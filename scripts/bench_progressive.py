@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Wall-clock-to-quality comparison of fixed-resolution and progressive training.
+
+Trains one viseme class twice with the same epoch budget, once at TRAINING.img_size
+throughout and once with PROGRESSIVE enabled, evaluating held-out KID (see
+lipgans.train.quality) every --eval-every epochs with early stopping off. Reports
+training seconds (evaluation time excluded), the final and best KID, and the
+training seconds each mode needs to reach a target KID (default: the fixed run's
+final KID), followed by the KID curves.
+
+Usage:
+  python scripts/bench_progressive.py --paths config/paths.yaml --viseme 03_Open_Mouth --epochs 30
+  python scripts/bench_progressive.py --paths config/paths.yaml --viseme 03_Open_Mouth --stage-epochs 5 --fade-epochs 2
+"""
+import argparse
+import copy
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lipgans.config import Config
+from lipgans.train.train_viseme import train_one_class
+
+
+def _run(cfg: Config, viseme: str, progressive: bool, root: Path, max_batches) -> list:
+    """Train one mode; returns [(epoch, cumulative train seconds, kid)] per evaluation."""
+    cfg = copy.deepcopy(cfg)
+    mode = "progressive" if progressive else "fixed"
+    cfg.progressive.enabled = progressive
+    cfg.paths.models_root = root / mode
+    cfg.telemetry.enabled, cfg.telemetry.jsonl, cfg.telemetry.tensorboard = True, True, False
+    cfg.telemetry.log_dir = root / mode / "logs"
+    cfg.telemetry.profile_steps = 0
+    cfg.checkpoint.every_epochs = cfg.train.epochs
+    train_one_class(cfg, viseme, max_batches=max_batches)
+
+    records = [json.loads(line) for line in (cfg.telemetry.log_dir / f"{viseme}.jsonl").read_text().splitlines()]
+    wall, curve = 0.0, []
+    epoch = 0
+    for r in records:
+        if r["type"] == "epoch":
+            wall += r["epoch_s"]
+            epoch = r["epoch"]
+        elif r["type"] == "quality":
+            curve.append((epoch, wall, r["kid"]))
+    return curve
+
+
+def _time_to(curve: list, target: float):
+    return next((s for _, s, k in curve if k <= target), None)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--viseme", default="03_Open_Mouth", help="Viseme class to train")
+    ap.add_argument("--epochs", type=int, default=None, help="Epoch budget per mode (default TRAINING.epochs)")
+    ap.add_argument("--eval-every", type=int, default=1, help="KID evaluation interval in epochs")
+    ap.add_argument("--start-size", type=int, default=None, help="Override PROGRESSIVE.start_size")
+    ap.add_argument("--stage-epochs", type=int, default=None, help="Override PROGRESSIVE.stage_epochs")
+    ap.add_argument("--fade-epochs", type=int, default=None, help="Override PROGRESSIVE.fade_epochs")
+    ap.add_argument("--max-batches", type=int, default=None, help="Cap on train steps per epoch")
+    ap.add_argument("--target", type=float, default=None, help="Target KID (default: final KID of the fixed run)")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    cfg.train.epochs = args.epochs or cfg.train.epochs
+    cfg.quality.enabled, cfg.quality.every_epochs, cfg.quality.patience = True, args.eval_every, 0
+    p = cfg.progressive
+    p.start_size = args.start_size or p.start_size
+    p.stage_epochs = args.stage_epochs or p.stage_epochs
+    p.fade_epochs = args.fade_epochs if args.fade_epochs is not None else p.fade_epochs
+
+    with tempfile.TemporaryDirectory(prefix="lipgans_progressive_") as tmp:
+        curves = {mode: _run(cfg, args.viseme, mode == "progressive", Path(tmp), args.max_batches)
+                  for mode in ("fixed", "progressive")}
+    if not all(curves.values()):
+        print("❌ No KID evaluations recorded (does the class have held-out clips?)")
+        return
+
+    target = args.target if args.target is not None else curves["fixed"][-1][2]
+    print(f"\n{args.viseme}: {cfg.train.epochs} epochs, img {tuple(cfg.train.img_size)}, progressive from "
+          f"{p.start_size}px, {p.stage_epochs} epochs/stage, {p.fade_epochs} fade epochs; target KID {target:.5f}")
+    print(f"{'mode':<12} {'train s':>9} {'final KID':>10} {'best KID':>10} {'s to target':>12}")
+    for mode, curve in curves.items():
+        reach = _time_to(curve, target)
+        print(f"{mode:<12} {curve[-1][1]:>9.1f} {curve[-1][2]:>10.5f} {min(k for _, _, k in curve):>10.5f} "
+              f"{'-' if reach is None else f'{reach:.1f}':>12}")
+
+    print("\nKID curves (epoch, train s, KID):")
+    for mode, curve in curves.items():
+        print(f"  {mode:<12} " + "  ".join(f"{e}:{s:.0f}s:{k:.4f}" for e, s, k in curve))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark VisemeGAN.train_step throughput (steps/s) for every combination of
+XLA compilation and precision policy, on random uint8 clips of the configured
+shape. Run it on each training host to pick TRAINING.jit_compile and
+TRAINING.mixed_precision.
+
+Usage:
+  python scripts/bench_train_step.py --paths config/paths.yaml --steps 20
+  python scripts/bench_train_step.py --paths config/paths.yaml --policies float32 mixed_bfloat16 --jit off
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import tensorflow as tf
+
+from lipgans.config import Config
+from lipgans.models.gan3d import VisemeGAN
+from lipgans.utils.precision import POLICIES, make_optimizer, set_policy
+
+
+def _bench(cfg: Config, policy: str, jit: bool, steps: int, warmup: int) -> float:
+    tf.keras.backend.clear_session()
+    set_policy(policy)
+    T, (H, W) = cfg.train.target_frames, cfg.train.img_size
+    gan = VisemeGAN(z_dim=cfg.train.z_dim, target_frames=T, img_size=(H, W), jit_compile=jit)
+    g_opt = make_optimizer(cfg.train.lr, policy)
+    d_opt = make_optimizer(cfg.train.lr, policy)
+    real = tf.random.uniform([cfg.train.batch_size, T, H, W, 3], 0, 256, dtype=tf.int32)
+    real = tf.cast(real, tf.uint8)
+
+    for _ in range(warmup):  # tracing / XLA compilation
+        g_loss, _ = gan.train_step(real, g_opt, d_opt)
+    float(g_loss)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        g_loss, _ = gan.train_step(real, g_opt, d_opt)
+    float(g_loss)  # wait for the last step
+    return steps / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--steps", type=int, default=20, help="Timed steps per combination")
+    ap.add_argument("--warmup", type=int, default=3, help="Untimed steps per combination")
+    ap.add_argument("--policies", nargs="*", default=list(POLICIES), help="Precision policies to test")
+    ap.add_argument("--jit", choices=["off", "on", "both"], default="both", help="XLA settings to test")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    print(f"[INFO] batch={cfg.train.batch_size} T={cfg.train.target_frames} img={tuple(cfg.train.img_size)} "
+          f"devices={[d.device_type for d in tf.config.list_physical_devices()]}")
+    for policy in args.policies:
+        for jit in {"off": (False,), "on": (True,), "both": (False, True)}[args.jit]:
+            name = f"{policy} jit={'on' if jit else 'off'}"
+            try:
+                rate = _bench(cfg, policy, jit, args.steps, args.warmup)
+            except Exception as e:
+                print(f"{name:<28} [ERROR] {type(e).__name__}: {str(e).splitlines()[0]}")
+                continue
+            print(f"{name:<28} {rate:8.2f} steps/s  {rate * cfg.train.batch_size:8.1f} clips/s")
+    set_policy("float32")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Precompute the frame bank used for generator-free serving (INFERENCE.bank_dir).
+
+Samples --clips clips per viseme class from the latest generator export (or
+INFERENCE.epoch) and writes them as one uint8 array (memory-mapped when served) plus index.json,
+in a new version subdirectory that the CURRENT file is switched to. With bank_dir
+set, generate_word / generate_text assemble frames by lookup from it and rebuild it
+automatically when a newer generator_epoch_*.model.keras appears.
+
+Usage:
+  python scripts/build_frame_bank.py --paths config/paths.yaml
+  python scripts/build_frame_bank.py --paths config/paths.yaml --clips 128 --out models/frame_bank
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lipgans.config import Config
+from lipgans.generate.bank import BANK_DATA, FrameBank, build_bank
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--clips", type=int, default=None, help="Clips per class (default INFERENCE.bank_clips)")
+    ap.add_argument("--out", default=None, help="Bank directory (default INFERENCE.bank_dir)")
+    ap.add_argument("--seed", type=int, default=0, help="Seed for the sampled latents")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    bank_dir = Path(args.out) if args.out else cfg.inference.bank_dir
+    if bank_dir is None:
+        print("❌ No bank directory: set INFERENCE.bank_dir or pass --out")
+        return
+    bank = FrameBank(build_bank(cfg, bank_dir, clips=args.clips, seed=args.seed))
+    size_mb = (bank.path / BANK_DATA).stat().st_size / 2 ** 20
+    print(f"[OK] Frame bank {bank_dir}: {len(bank.classes)} classes, clips {tuple(bank.clips.shape)}, {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Pack cropped clips into per-class uint8 memory-mapped caches for training.
+
+make_dataset compiles missing or stale caches on demand; run this once up front to
+keep that cost out of the first training epoch.
+
+Usage:
+  python scripts/compile_cache.py --paths config/paths.yaml
+  python scripts/compile_cache.py --paths config/paths.yaml --subset 01_Closed_Lips 03_Open_Mouth
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lipgans.config import Config
+from lipgans.data.dataset import compile_clip_cache
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--subset", nargs="*", default=None, help="Optional list of viseme classes to compile")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    if cfg.paths.cache_dir is None:
+        print("[ERROR] OUTPUT.cache_dir is not set in the config")
+        return
+
+    classes = args.subset or sorted(p.name for p in Path(cfg.paths.cropped_dir).iterdir() if p.is_dir())
+    for viseme in classes:
+        path = compile_clip_cache(cfg.paths.cropped_dir, viseme, cfg.paths.cache_dir,
+                                  target_frames=cfg.train.target_frames,
+                                  img_size=tuple(cfg.train.img_size))
+        print(f"[OK] {viseme}: {path}")
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 Crop mouth ROI from per-viseme clips and save 64x64 PNG frames.
 
 Usage:
-  python scripts/crop_all.py --paths config/paths.yaml
+  python scripts/crop_all.py --paths config/paths.yaml [--workers 16] [--manifest crops.csv]
 """
 import argparse
 import sys
@@ -17,13 +17,21 @@ from lipgans.data.crop_mouth import crop_all_frames
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes, each with its own FaceMesh (overrides PREPROCESS.workers; 0 = all cores)")
+    ap.add_argument("--manifest", default=None, help="Per-clip manifest path (.json or .csv); default <cropped_dir>/crop_manifest.json")
     args = ap.parse_args()
 
     cfg = Config.load(args.paths)
     print(f"[INFO] Viseme clips dir: {cfg.paths.viseme_clips_dir}")
     print(f"[INFO] Cropped output dir: {cfg.paths.cropped_dir}")
 
-    crop_all_frames(cfg.paths.viseme_clips_dir, cfg.paths.cropped_dir, resize=tuple(cfg.train.img_size))
+    crop_all_frames(cfg.paths.viseme_clips_dir, cfg.paths.cropped_dir, resize=tuple(cfg.train.img_size),
+                    detect_every=cfg.preprocess.detect_every,
+                    detect_scale=cfg.preprocess.detect_scale,
+                    smoothing=cfg.preprocess.box_smoothing,
+                    workers=cfg.preprocess.workers if args.workers is None else args.workers,
+                    manifest_path=Path(args.manifest) if args.manifest else None,
+                    writer_kwargs=cfg.preprocess.writer_kwargs())
     print("[DONE] Cropping finished.")
 
 if __name__ == "__main__":
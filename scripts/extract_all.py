@@ -3,7 +3,7 @@
 Slice raw videos into per-viseme clips using MLF timestamps.
 
 Usage:
-  python scripts/extract_all.py --paths config/paths.yaml --record-prefix "lipspeakers/..."
+  python scripts/extract_all.py --paths config/paths.yaml --record-prefix "lipspeakers/..." [--sequential] [--workers 32]
 """
 import argparse
 import sys
@@ -13,19 +13,26 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from lipgans.config import Config
-from lipgans.data.extract_viseme_clips import extract_all_from_dir
+from lipgans.data.extract_viseme_clips import extract_all_frames_from_dir
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
     ap.add_argument("--record-prefix", default="", help="Optional record prefix used in your MLF paths")
+    ap.add_argument("--sequential", action="store_true", help="Decode each video once instead of seeking per segment")
+    ap.add_argument("--workers", type=int, default=None, help="Extraction processes (overrides PREPROCESS.workers; 0 = all cores)")
     args = ap.parse_args()
 
     cfg = Config.load(args.paths)
     print(f"[INFO] raw_videos_dir = {cfg.paths.raw_videos_dir}")
     print(f"[INFO] mlf_path = {cfg.paths.mlf_path}")
-    print("[INFO] Starting extraction (this calls ffmpeg for each segment)...")
-    extract_all_from_dir(cfg.paths.raw_videos_dir, cfg.paths.mlf_path, cfg.paths.viseme_clips_dir, record_prefix=args.record_prefix)
+    print("[INFO] Starting extraction...")
+    workers = cfg.preprocess.workers if args.workers is None else args.workers
+    extract_all_frames_from_dir(cfg.paths.raw_videos_dir, cfg.paths.mlf_path, cfg.paths.viseme_clips_dir,
+                                record_prefix=args.record_prefix,
+                                sequential=args.sequential or cfg.preprocess.sequential_decode,
+                                workers=workers,
+                                writer_kwargs=cfg.preprocess.writer_kwargs())
     print("[DONE] Extraction complete.")
 
 if __name__ == "__main__":
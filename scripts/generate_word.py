@@ -4,6 +4,7 @@ Generate a GIF and MP4 for a single word using trained viseme GANs.
 
 Usage:
   python scripts/generate_word.py --paths config/paths.yaml --word hello
+  python scripts/generate_word.py --paths config/paths.yaml --word hello --frames
 """
 import argparse
 import sys
@@ -19,13 +20,14 @@ def main():
     ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
     ap.add_argument("--word", required=True, help="Word to generate")
     ap.add_argument("--out", default=None, help="Optional output directory (overrides config)")
+    ap.add_argument("--frames", action="store_true", help="Also save the individual PNG frames")
     args = ap.parse_args()
 
     cfg = Config.load(args.paths)
     out_dir = Path(args.out) if args.out else None
 
     try:
-        gif_path, mp4_path = generate_word(args.word, cfg, out_dir=out_dir)
+        gif_path, mp4_path = generate_word(args.word, cfg, out_dir=out_dir, save_frames=args.frames)
         print(f"[OK] GIF saved to: {gif_path}")
         print(f"[OK] MP4 saved to: {mp4_path}")
     except Exception as e:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Decode raw videos once and write training-ready mouth crops straight into
+cropped_dir (fused extract_all.py + crop_all.py, no intermediate full frames).
+
+Usage:
+  python scripts/preprocess_all.py --paths config/paths.yaml --record-prefix "lipspeakers/..." --workers 8
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lipgans.config import Config
+from lipgans.data.preprocess import preprocess_all
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
+    ap.add_argument("--record-prefix", default="", help="Optional record prefix used in your MLF paths")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (overrides PREPROCESS.workers; 0 = all cores)")
+    args = ap.parse_args()
+
+    cfg = Config.load(args.paths)
+    print(f"[INFO] raw_videos_dir = {cfg.paths.raw_videos_dir}")
+    print(f"[INFO] Cropped output dir: {cfg.paths.cropped_dir}")
+    workers = cfg.preprocess.workers if args.workers is None else args.workers
+    preprocess_all(cfg.paths.raw_videos_dir, cfg.paths.mlf_path, cfg.paths.cropped_dir,
+                   record_prefix=args.record_prefix,
+                   img_size=tuple(cfg.train.img_size),
+                   fps=cfg.paths.fps,
+                   workers=workers,
+                   detect_every=cfg.preprocess.detect_every,
+                   detect_scale=cfg.preprocess.detect_scale,
+                   smoothing=cfg.preprocess.box_smoothing,
+                   writer_kwargs=cfg.preprocess.writer_kwargs())
+    print("[DONE] Preprocessing finished.")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ Train GANs for all viseme classes (or a subset).
 Usage:
   python scripts/train_all.py --paths config/paths.yaml
   python scripts/train_all.py --paths config/paths.yaml --subset 01_Closed_Lips 03_Open_Mouth
+  python scripts/train_all.py --paths config/paths.yaml --workers 4 --resume
+  python scripts/train_all.py --paths config/paths.yaml --fresh
+  python scripts/train_all.py --paths config/paths.yaml --conditional
 """
 import argparse
 import sys
@@ -13,17 +16,30 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from lipgans.config import Config
-from lipgans.train.train_viseme import train_all
+from lipgans.train.train_viseme import train_all, train_conditional
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--paths", required=True, help="Path to config/paths.yaml")
     ap.add_argument("--subset", nargs="*", default=None, help="Optional list of viseme classes to train")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Classes to train in parallel (overrides TRAINING.workers)")
+    ap.add_argument("--resume", action="store_true",
+                    help="Skip finished classes and continue the others from their latest checkpoint")
+    ap.add_argument("--fresh", action="store_true",
+                    help="Start over, discarding the checkpoints of a previous run")
+    ap.add_argument("--conditional", action="store_true",
+                    help="Train one class-conditional GAN on all classes instead of one GAN per class")
     args = ap.parse_args()
+    if args.resume and args.fresh:
+        ap.error("--resume and --fresh are mutually exclusive")
 
     cfg = Config.load(args.paths)
     print("[INFO] Starting training loop.")
-    train_all(cfg, subset=args.subset)
+    if args.conditional:
+        train_conditional(cfg, subset=args.subset, resume=args.resume, fresh=args.fresh)
+    else:
+        train_all(cfg, subset=args.subset, resume=args.resume, workers=args.workers, fresh=args.fresh)
     print("[DONE] Training complete.")
 
 if __name__ == "__main__":
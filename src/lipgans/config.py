@@ -1,5 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
 import yaml
 
 
@@ -12,6 +13,7 @@ class Paths:
     models_root: Path
     merge_dir: Path
     fps: int
+    cache_dir: Optional[Path] = None   # memory-mapped clip cache for make_dataset (off if unset)
 
 
 @dataclass
@@ -22,6 +24,82 @@ class TrainCfg:
     batch_size: int = 16
     epochs: int = 100
     lr: float = 1e-4
+    jit_compile: bool = False         # XLA-compile the train step
+    mixed_precision: str = "float32"  # Keras policy: float32 | mixed_float16 | mixed_bfloat16
+    workers: int = 1                  # classes trained concurrently by train_all (0 = one per core)
+    threads_per_worker: int = 0       # TF intra-op threads / pinned cores per worker; 0 = cores // workers
+    inter_op_threads: int = 2         # TF inter-op threads per worker
+
+
+@dataclass
+class PreprocessCfg:
+    workers: int = 1              # process-pool size for extraction; 0 = one per CPU core
+    sequential_decode: bool = False
+    detect_every: int = 1         # run FaceMesh every N frames, interpolate the mouth box in between
+    detect_scale: float = 1.0     # downscale factor for the frame passed to FaceMesh
+    box_smoothing: float = 0.0    # EMA weight on the previous mouth box, in [0, 1)
+    writer_threads: int = 4       # background PNG encode/write threads per process
+    writer_queue: int = 64        # max frames queued before decoding blocks
+    png_compression: int = 1      # cv2 PNG compression level, 0-9
+
+    def writer_kwargs(self) -> dict:
+        """Keyword arguments for lipgans.utils.writer.ImageWriter."""
+        return dict(threads=self.writer_threads, max_pending=self.writer_queue,
+                    png_compression=self.png_compression)
+
+
+@dataclass
+class CheckpointCfg:
+    every_epochs: int = 10        # checkpoint + sample frames + generator export interval
+    keep_last: int = 3            # most recent checkpoints kept
+    keep_best: int = 1            # best checkpoints kept by metric (0 = off)
+    async_save: bool = True       # write checkpoints on a background thread
+    export_generator: bool = True # also save generator_epoch_N.model.keras for inference
+
+
+@dataclass
+class TelemetryCfg:
+    enabled: bool = True
+    log_dir: Optional[Path] = None  # default: <models_root>/logs
+    log_every: int = 10             # per-step records every N steps (epoch records always)
+    tensorboard: bool = True
+    jsonl: bool = True
+    profile_start: int = 0          # first global step of the tf.profiler trace
+    profile_steps: int = 0          # steps to trace; 0 = no profiling
+
+
+@dataclass
+class QualityCfg:
+    enabled: bool = True
+    holdout: float = 0.1          # fraction of each class's clips held out (hash of clip name)
+    every_epochs: int = 5         # KID evaluation interval
+    max_clips: int = 256          # held-out clips used per evaluation (split across classes if conditional)
+    batch_size: int = 64
+    patience: int = 4             # evaluations without KID improvement before stopping; 0 = never stop
+    min_delta: float = 0.0        # KID decrease that counts as improvement
+    min_epochs: int = 20          # no early stopping before this epoch
+    collapse_ratio: float = 0.25  # alert when fake/real feature diversity drops below this
+
+
+@dataclass
+class ProgressiveCfg:
+    enabled: bool = False         # grow per-class GANs from start_size to TRAINING.img_size
+    start_size: int = 16          # first stage resolution; doubles every stage
+    stage_epochs: int = 10        # epochs per stage below full size (full size trains for the rest)
+    fade_epochs: int = 5          # epochs over which each new block is blended in
+
+
+@dataclass
+class InferenceCfg:
+    epoch: Optional[int] = None   # generator_epoch_N to load; None = latest export per class
+    max_models: int = 0           # generators kept loaded (LRU); 0 = no limit
+    max_mb: float = 0.0           # weight memory of loaded generators in MB (LRU); 0 = no limit
+    prewarm: bool = False         # load every class's generator when the frontend starts
+    chunk_frames: int = 0         # frames per streamed chunk (generate_text); 0 = one chunk per word
+    pause_s: float = 0.2          # pause held at sentence punctuation when streaming text
+    conditional: bool = True      # serve from models_root/conditional when exported (else per-class GANs)
+    bank_dir: Optional[Path] = None  # serve from a precomputed frame bank here (off if unset)
+    bank_clips: int = 64          # clips sampled per viseme class when (re)building the bank
 
 
 @dataclass
@@ -29,6 +107,12 @@ class Config:
     paths: Paths
     train: TrainCfg
     grid_samples_per_class: int = 5
+    preprocess: PreprocessCfg = field(default_factory=PreprocessCfg)
+    checkpoint: CheckpointCfg = field(default_factory=CheckpointCfg)
+    telemetry: TelemetryCfg = field(default_factory=TelemetryCfg)
+    quality: QualityCfg = field(default_factory=QualityCfg)
+    progressive: ProgressiveCfg = field(default_factory=ProgressiveCfg)
+    inference: InferenceCfg = field(default_factory=InferenceCfg)
 
     @staticmethod
     def load(yaml_path: str) -> "Config":
@@ -39,6 +123,12 @@ class Config:
         o = y["OUTPUT"]
         t = y["TRAINING"]
         v = y.get("VIZ", {})
+        pp = y.get("PREPROCESS", {})
+        c = y.get("CHECKPOINT", {})
+        tm = y.get("TELEMETRY", {})
+        q = y.get("QUALITY", {})
+        pg = y.get("PROGRESSIVE", {})
+        inf = y.get("INFERENCE", {})
 
         paths = Paths(
             raw_videos_dir=Path(p["raw_videos_dir"]),
@@ -48,6 +138,7 @@ class Config:
             models_root=Path(o["models_root"]),
             merge_dir=Path(o["merge_dir"]),
             fps=int(p["fps"]),
+            cache_dir=Path(o["cache_dir"]) if o.get("cache_dir") else None,
         )
 
         train = TrainCfg(
@@ -57,10 +148,71 @@ class Config:
             batch_size=int(t["batch_size"]),
             epochs=int(t["epochs"]),
             lr=float(t["lr"]),
+            jit_compile=bool(t.get("jit_compile", False)),
+            mixed_precision=str(t.get("mixed_precision", "float32")),
+            workers=int(t.get("workers", 1)),
+            threads_per_worker=int(t.get("threads_per_worker", 0)),
+            inter_op_threads=int(t.get("inter_op_threads", 2)),
+        )
+
+        preprocess = PreprocessCfg(
+            workers=int(pp.get("workers", 1)),
+            sequential_decode=bool(pp.get("sequential_decode", False)),
+            detect_every=int(pp.get("detect_every", 1)),
+            detect_scale=float(pp.get("detect_scale", 1.0)),
+            box_smoothing=float(pp.get("box_smoothing", 0.0)),
+            writer_threads=int(pp.get("writer_threads", 4)),
+            writer_queue=int(pp.get("writer_queue", 64)),
+            png_compression=int(pp.get("png_compression", 1)),
         )
 
         return Config(
             paths=paths,
             train=train,
             grid_samples_per_class=int(v.get("grid_samples_per_class", 5)),
+            preprocess=preprocess,
+            checkpoint=CheckpointCfg(
+                every_epochs=int(c.get("every_epochs", 10)),
+                keep_last=int(c.get("keep_last", 3)),
+                keep_best=int(c.get("keep_best", 1)),
+                async_save=bool(c.get("async_save", True)),
+                export_generator=bool(c.get("export_generator", True)),
+            ),
+            telemetry=TelemetryCfg(
+                enabled=bool(tm.get("enabled", True)),
+                log_dir=Path(tm["log_dir"]) if tm.get("log_dir") else None,
+                log_every=int(tm.get("log_every", 10)),
+                tensorboard=bool(tm.get("tensorboard", True)),
+                jsonl=bool(tm.get("jsonl", True)),
+                profile_start=int(tm.get("profile_start", 0)),
+                profile_steps=int(tm.get("profile_steps", 0)),
+            ),
+            quality=QualityCfg(
+                enabled=bool(q.get("enabled", True)),
+                holdout=float(q.get("holdout", 0.1)),
+                every_epochs=int(q.get("every_epochs", 5)),
+                max_clips=int(q.get("max_clips", 256)),
+                batch_size=int(q.get("batch_size", 64)),
+                patience=int(q.get("patience", 4)),
+                min_delta=float(q.get("min_delta", 0.0)),
+                min_epochs=int(q.get("min_epochs", 20)),
+                collapse_ratio=float(q.get("collapse_ratio", 0.25)),
+            ),
+            progressive=ProgressiveCfg(
+                enabled=bool(pg.get("enabled", False)),
+                start_size=int(pg.get("start_size", 16)),
+                stage_epochs=int(pg.get("stage_epochs", 10)),
+                fade_epochs=int(pg.get("fade_epochs", 5)),
+            ),
+            inference=InferenceCfg(
+                epoch=int(inf["epoch"]) if inf.get("epoch") is not None else None,
+                max_models=int(inf.get("max_models", 0)),
+                max_mb=float(inf.get("max_mb", 0.0)),
+                prewarm=bool(inf.get("prewarm", False)),
+                chunk_frames=int(inf.get("chunk_frames", 0)),
+                pause_s=float(inf.get("pause_s", 0.2)),
+                conditional=bool(inf.get("conditional", True)),
+                bank_dir=Path(inf["bank_dir"]) if inf.get("bank_dir") else None,
+                bank_clips=int(inf.get("bank_clips", 64)),
+            ),
         )
@@ -1,8 +1,17 @@
+import csv
+import json
+import time
+from functools import partial
 from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 import cv2
+import numpy as np
 import mediapipe as mp
 from tqdm import tqdm
 
+from ..utils.parallel import map_isolated, resolve_workers
+from ..utils.writer import ImageWriter
+
 mp_face_mesh = mp.solutions.face_mesh
 MOUTH_LANDMARKS = list(set([
     61,146,91,181,84,17,314,405,321,375,291,308,324,318,402,317,
@@ -11,72 +20,338 @@ MOUTH_LANDMARKS = list(set([
 ]))
 
 
+def _mouth_box(landmarks, w: int, h: int, margin: int = 10) -> Tuple[int, int, int, int]:
+    """Pixel bounding box (x_min, y_min, x_max, y_max) of MOUTH_LANDMARKS plus a margin."""
+    xs = [int(landmarks[i].x * w) for i in MOUTH_LANDMARKS]
+    ys = [int(landmarks[i].y * h) for i in MOUTH_LANDMARKS]
+    x_min, x_max = max(min(xs) - margin, 0), min(max(xs) + margin, w)
+    y_min, y_max = max(min(ys) - margin, 0), min(max(ys) + margin, h)
+    return x_min, y_min, x_max, y_max
+
+
 def crop_mouth_roi(img):
     """
     Crop the mouth region from an image using MediaPipe FaceMesh.
     Returns None if no face detected.
+
+    Builds a fresh detector per call; use MouthCropper when processing many frames.
     """
     h, w, _ = img.shape
     with mp_face_mesh.FaceMesh(static_image_mode=True) as face_mesh:
         results = face_mesh.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
         if not results.multi_face_landmarks:
             return None
-        landmarks = results.multi_face_landmarks[0].landmark
-        xs = [int(landmarks[i].x * w) for i in MOUTH_LANDMARKS]
-        ys = [int(landmarks[i].y * h) for i in MOUTH_LANDMARKS]
-        x_min, x_max = max(min(xs) - 10, 0), min(max(xs) + 10, w)
-        y_min, y_max = max(min(ys) - 10, 0), min(max(ys) + 10, h)
+        x_min, y_min, x_max, y_max = _mouth_box(results.multi_face_landmarks[0].landmark, w, h)
         return img[y_min:y_max, x_min:x_max]
 
 
-def crop_all_frames(viseme_clips_dir: Path, cropped_dir: Path, resize=(64, 64)):
+Box = Tuple[int, int, int, int]
+
+
+class MouthCropper:
     """
-    Crop mouth region from all frames in all viseme MP4 clips.
-    Saves frames as PNGs in a mirrored directory structure.
+    Mouth ROI cropper that keeps one FaceMesh alive across frames.
+
+    By default the detector runs in video/tracking mode, so after the first frame
+    of a clip MediaPipe tracks the face from the previous landmarks instead of
+    running full detection. Call `reset()` between clips so tracking state does
+    not leak from one clip into the next.
+
+    For sequences, `crop_stream` can run landmarks only on every `detect_every`-th
+    frame (optionally on a copy downscaled by `detect_scale`) and linearly
+    interpolate the mouth box in between. If the next keyframe finds no face or the
+    box moved by more than `max_drift` (relative to its size), the skipped frames
+    are detected individually instead. `smoothing` in [0, 1) applies an exponential
+    moving average to the emitted boxes to stop crops jittering frame to frame.
     """
-    cropped_dir.mkdir(parents=True, exist_ok=True)
 
-    for viseme_dir in tqdm(list(viseme_clips_dir.iterdir()), desc="Viseme classes"):
-        if not viseme_dir.is_dir():
-            continue
+    def __init__(self, static_image_mode: bool = False, margin: int = 10,
+                 min_detection_confidence: float = 0.5, min_tracking_confidence: float = 0.5,
+                 detect_every: int = 1, detect_scale: float = 1.0,
+                 smoothing: float = 0.0, max_drift: float = 0.25):
+        self.margin = margin
+        self.detect_every = max(1, int(detect_every))
+        self.detect_scale = float(detect_scale)
+        self.smoothing = float(smoothing)
+        self.max_drift = float(max_drift)
+        self.detections = 0
+        self._ema: Optional[np.ndarray] = None
+        self._mesh = mp_face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=1,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
 
-        out_viseme_dir = cropped_dir / viseme_dir.name
-        out_viseme_dir.mkdir(exist_ok=True)
+    def reset(self):
+        """Drop tracking and smoothing state (start of a new clip)."""
+        self._ema = None
+        self._reset_tracking()
 
-        for clip_path in tqdm(list(viseme_dir.iterdir()), desc=f"Clips in {viseme_dir.name}", leave=False):
-            if clip_path.suffix.lower() != ".mp4":
+    def _reset_tracking(self):
+        if hasattr(self._mesh, "reset"):
+            self._mesh.reset()
+
+    def box(self, img) -> Optional[Box]:
+        """Mouth bounding box in pixel coordinates of `img`, or None if no face detected."""
+        h, w, _ = img.shape
+        small = img
+        if self.detect_scale < 1.0:
+            small = cv2.resize(img, None, fx=self.detect_scale, fy=self.detect_scale, interpolation=cv2.INTER_AREA)
+        self.detections += 1
+        results = self._mesh.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        if not results.multi_face_landmarks:
+            return None
+        # landmarks are normalised, so the box maps straight back to full resolution
+        return _mouth_box(results.multi_face_landmarks[0].landmark, w, h, self.margin)
+
+    def crop(self, img):
+        """Crop the mouth region of `img` (detects on this frame); returns None if no face detected."""
+        return _apply_box(img, self._smooth(self.box(img)))
+
+    def crop_stream(self, frames: Iterable[Tuple[Any, np.ndarray]]) -> Iterator[Tuple[Any, Optional[np.ndarray]]]:
+        """
+        Crop a sequence of consecutive frames.
+
+        Args:
+            frames: iterable of (key, frame) pairs in temporal order; keys are passed through.
+
+        Yields:
+            (key, roi) in input order, roi None where no face was found.
+        """
+        pending: List[Tuple[Any, np.ndarray]] = []
+        last_box: Optional[Box] = None
+
+        for key, frame in frames:
+            if last_box is not None and len(pending) < self.detect_every - 1:
+                pending.append((key, frame))
                 continue
+            last_box = yield from self._keyframe(pending, last_box, key, frame)
+            pending = []
+
+        if pending:
+            key, frame = pending.pop()
+            yield from self._keyframe(pending, last_box, key, frame)
+
+    def _keyframe(self, pending, b0: Optional[Box], key, frame):
+        """Detect keyframe `frame`, emit the buffered frames since the keyframe with box
+        b0 and then the keyframe itself; returns the keyframe's box.
+
+        If either keyframe has no face or the box drifted, the buffered frames are
+        detected individually. The probe has already run the tracker on the new
+        keyframe, so tracking is restarted and the buffered frames and the keyframe
+        are detected again in temporal order.
+        """
+        b1 = self.box(frame)
+        if pending and (b0 is None or b1 is None or self._drifted(b0, b1)):
+            self._reset_tracking()
+            for k, f in pending:
+                yield k, _apply_box(f, self._smooth(self.box(f)))
+            b1 = self.box(frame)
+        else:
+            yield from self._interpolate(pending, b0, b1)
+        yield key, _apply_box(frame, self._smooth(b1))
+        return b1
+
+    def _interpolate(self, pending, b0: Box, b1: Box):
+        """Emit buffered frames with boxes linearly interpolated between keyframe boxes b0 and b1."""
+        if not pending:
+            return
+        a, b = np.asarray(b0, dtype=np.float64), np.asarray(b1, dtype=np.float64)
+        m = len(pending)
+        for j, (key, frame) in enumerate(pending, start=1):
+            yield key, _apply_box(frame, self._smooth(a + (b - a) * (j / (m + 1))))
+
+    def _drifted(self, b0: Box, b1: Box) -> bool:
+        size0 = max(b0[2] - b0[0], b0[3] - b0[1], 1)
+        size1 = max(b1[2] - b1[0], b1[3] - b1[1], 1)
+        shift = np.hypot((b1[0] + b1[2] - b0[0] - b0[2]) / 2, (b1[1] + b1[3] - b0[1] - b0[3]) / 2)
+        return shift / size0 > self.max_drift or abs(size1 / size0 - 1.0) > self.max_drift
+
+    def _smooth(self, box) -> Optional[np.ndarray]:
+        if box is None:
+            self._ema = None
+            return None
+        box = np.asarray(box, dtype=np.float64)
+        if self._ema is None or self.smoothing <= 0:
+            self._ema = box
+        else:
+            self._ema = self.smoothing * self._ema + (1.0 - self.smoothing) * box
+        return self._ema
+
+    def close(self):
+        self._mesh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-            cap = cv2.VideoCapture(str(clip_path))
-            if not cap.isOpened():
-                print(f"⚠️ Cannot open video: {clip_path}")
+
+def _apply_box(img, box) -> Optional[np.ndarray]:
+    """Crop `img` to a (possibly fractional) box, clamped to the image; None if empty."""
+    if box is None:
+        return None
+    h, w = img.shape[:2]
+    x_min, y_min, x_max, y_max = (int(round(v)) for v in box)
+    x_min, y_min = max(x_min, 0), max(y_min, 0)
+    x_max, y_max = min(x_max, w), min(y_max, h)
+    if x_max <= x_min or y_max <= y_min:
+        return None
+    return img[y_min:y_max, x_min:x_max]
+
+
+def _read_frames(cap) -> Iterator[Tuple[int, np.ndarray]]:
+    frame_idx = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame_idx, frame
+        frame_idx += 1
+
+
+def _crop_clip(clip_path: Path, out_clip_dir: Path, cropper: MouthCropper, resize=(64, 64),
+               writer: Optional[ImageWriter] = None) -> Tuple[int, int]:
+    """
+    Crop every frame of one clip into out_clip_dir.
+    Returns (frames_read, frames_without_face) once every crop has been written.
+    """
+    cap = cv2.VideoCapture(str(clip_path))
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {clip_path}")
+
+    out_clip_dir.mkdir(exist_ok=True)
+    cropper.reset()
+    own_writer = writer is None
+    if own_writer:
+        writer = ImageWriter()
+
+    frames = no_face = 0
+    try:
+        for frame_idx, roi in cropper.crop_stream(_read_frames(cap)):
+            frames += 1
+            if roi is None:
+                no_face += 1
                 continue
 
-            out_clip_dir = out_viseme_dir / clip_path.stem
-            out_clip_dir.mkdir(exist_ok=True)
+            roi_resized = cv2.resize(roi, resize)
+            out_file = out_clip_dir / f"{frame_idx:04d}.png"
+            writer.write(out_file, roi_resized)
+    finally:
+        cap.release()
+        if own_writer:
+            writer.close()
+        else:
+            writer.flush()
+    return frames, no_face
+
+
+# One cropper and PNG writer per worker process, created by _init_worker
+_WORKER_CROPPER: Optional[MouthCropper] = None
+_WORKER_WRITER: Optional[ImageWriter] = None
+
+
+def _init_worker(cropper_kwargs: dict, writer_kwargs: Optional[dict] = None):
+    global _WORKER_CROPPER, _WORKER_WRITER
+    _WORKER_CROPPER = MouthCropper(**cropper_kwargs)
+    _WORKER_WRITER = ImageWriter(**(writer_kwargs or {}))
+
+
+def _worker_cropper() -> MouthCropper:
+    return _WORKER_CROPPER
+
+
+def _worker_writer() -> ImageWriter:
+    return _WORKER_WRITER
 
-            frame_idx = 0
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
 
-                roi = crop_mouth_roi(frame)
-                if roi is None:
-                    frame_idx += 1
-                    continue
+def _crop_one(job: Tuple[Path, Path], resize=(64, 64)) -> Tuple[int, int]:
+    clip_path, out_clip_dir = job
+    return _crop_clip(clip_path, out_clip_dir, _worker_cropper(), resize, writer=_worker_writer())
+
+
+def write_manifest(rows: List[dict], path: Path):
+    """Write per-clip rows as JSON (.json) or CSV (any other suffix)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".json":
+        path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["viseme", "clip", "frames", "no_face", "elapsed_s", "error"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def crop_all_frames(viseme_clips_dir: Path, cropped_dir: Path, resize=(64, 64),
+                    detect_every: int = 1, detect_scale: float = 1.0, smoothing: float = 0.0,
+                    workers: int = 1, manifest_path: Optional[Path] = None,
+                    writer_kwargs: Optional[dict] = None) -> List[dict]:
+    """
+    Crop mouth region from all frames in all viseme MP4 clips.
+    Saves frames as PNGs in a mirrored directory structure.
+
+    Each worker process (or the current process when workers == 1) owns one
+    MouthCropper; `detect_every`, `detect_scale` and `smoothing` are passed through
+    to it. Clips are scheduled largest file first so long clips do not straggle at
+    the end. A manifest with frames processed, frames with no face detected and
+    elapsed time per clip (slowest first) is written to `manifest_path`
+    (default: cropped_dir/crop_manifest.json) and returned. PNGs are written by a
+    per-worker ImageWriter configured by `writer_kwargs`.
+    """
+    cropped_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for viseme_dir in sorted(viseme_clips_dir.iterdir()):
+        if not viseme_dir.is_dir():
+            continue
+        out_viseme_dir = cropped_dir / viseme_dir.name
+        out_viseme_dir.mkdir(exist_ok=True)
+        for clip_path in viseme_dir.iterdir():
+            if clip_path.suffix.lower() == ".mp4":
+                jobs.append((clip_path, out_viseme_dir / clip_path.stem))
+    jobs.sort(key=lambda j: j[0].stat().st_size, reverse=True)
+
+    workers = resolve_workers(workers)
+    cropper_kwargs = dict(detect_every=detect_every, detect_scale=detect_scale, smoothing=smoothing)
+    rows, frames = [], 0
+    t0 = time.perf_counter()
+    results = map_isolated(partial(_crop_one, resize=resize), jobs, workers=workers,
+                           initializer=_init_worker, initargs=(cropper_kwargs, writer_kwargs))
+    for res in tqdm(results, total=len(jobs), desc="Clips"):
+        clip_path = res.item[0]
+        n, no_face = res.value if res.ok else (0, 0)
+        frames += n
+        rows.append({"viseme": clip_path.parent.name, "clip": clip_path.stem, "frames": n,
+                     "no_face": no_face, "elapsed_s": round(res.elapsed, 3), "error": res.error or ""})
+        if not res.ok:
+            print(f"❌ {clip_path}: {res.error}")
+    elapsed = max(time.perf_counter() - t0, 1e-9)
 
-                roi_resized = cv2.resize(roi, resize)
-                out_file = out_clip_dir / f"{frame_idx:04d}.png"
-                cv2.imwrite(str(out_file), roi_resized)
-                frame_idx += 1
+    rows.sort(key=lambda r: r["elapsed_s"], reverse=True)
+    manifest_path = manifest_path or cropped_dir / "crop_manifest.json"
+    write_manifest(rows, manifest_path)
 
-            cap.release()
+    failed = sum(1 for r in rows if r["error"])
+    print(f"[INFO] {len(jobs)} clips in {elapsed:.1f}s with {workers} worker(s) | "
+          f"{len(jobs) / elapsed:.2f} clips/s, {frames / elapsed:.1f} frames/s | failed={failed}")
+    print(f"[INFO] Manifest written to {manifest_path}")
+    return rows
 
 
 # Example Usage
 # crop_all_frames(
 #     viseme_clips_dir=Path("data/viseme_clips"),
 #     cropped_dir=Path("data/cropped_frames"),
-#     resize=(64,64)
+#     resize=(64,64),
+#     workers=16,                       # one FaceMesh per worker process
 # )
+#
+# with MouthCropper() as cropper:       # one detector, tracking across frames
+#     roi = cropper.crop(frame)
+#
+# # landmarks every 4th frame on a half-size copy, smoothed boxes in between
+# with MouthCropper(detect_every=4, detect_scale=0.5, smoothing=0.6) as cropper:
+#     for idx, roi in cropper.crop_stream(enumerate(frames)):
+#         ...
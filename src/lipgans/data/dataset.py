@@ -1,20 +1,23 @@
+import hashlib
+import json
+import os
 from pathlib import Path
 import numpy as np
 import tensorflow as tf
 from PIL import Image
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
-def _load_clip(clip_dir: Path, target_frames: int, img_size: Tuple[int, int] = (64, 64)) -> Optional[np.ndarray]:
-    """Load frames from a clip directory, resize, normalize, and pad/subsample to target_frames.
-    Returns array shape (T, H, W, 3) with values in [-1, 1], or None if clip empty.
+
+def _load_clip_uint8(clip_dir: Path, target_frames: int, img_size: Tuple[int, int] = (64, 64)) -> Optional[np.ndarray]:
+    """Load frames from a clip directory, resize, and pad/subsample to target_frames.
+    Returns uint8 array shape (T, H, W, 3), or None if clip empty.
     """
     frame_paths = sorted([p for p in clip_dir.glob("*.png")])
     imgs = []
     for p in frame_paths:
         try:
             img = Image.open(p).convert("RGB").resize(img_size)
-            arr = np.asarray(img).astype(np.float32)
-            imgs.append(arr)
+            imgs.append(np.asarray(img, dtype=np.uint8))
         except Exception:
             continue
 
@@ -28,25 +31,172 @@ def _load_clip(clip_dir: Path, target_frames: int, img_size: Tuple[int, int] = (
         idx = np.linspace(0, len(imgs) - 1, target_frames).astype(int)
         imgs = [imgs[i] for i in idx]
 
-    arr = np.stack(imgs, axis=0)  # (T, H, W, 3)
+    return np.stack(imgs, axis=0)  # (T, H, W, 3)
+
+
+def _load_clip(clip_dir: Path, target_frames: int, img_size: Tuple[int, int] = (64, 64)) -> Optional[np.ndarray]:
+    """Load frames from a clip directory, resize, normalize, and pad/subsample to target_frames.
+    Returns array shape (T, H, W, 3) with values in [-1, 1], or None if clip empty.
+    Only used by the legacy generator pipeline; make_dataset yields uint8.
+    """
+    arr = _load_clip_uint8(clip_dir, target_frames, img_size)
+    if arr is None:
+        return None
     # Normalize to [-1, 1]
-    arr = arr / 127.5 - 1.0
-    return arr
+    return arr.astype(np.float32) / 127.5 - 1.0
 
-def make_dataset(cropped_root: Path,
-                 viseme_class: str,
-                 batch_size: int = 16,
-                 target_frames: int = 3,
-                 img_size: Tuple[int, int] = (64, 64)) -> tf.data.Dataset:
-    """Create a tf.data.Dataset for a single viseme class. Yields batches of shape
-       (B, T, H, W, 3) dtype float32 in [-1,1].
+
+def _clip_dirs(class_dir: Path) -> List[Path]:
+    return sorted(p for p in class_dir.iterdir() if p.is_dir())
+
+
+SPLITS = ("all", "train", "holdout")
+
+
+def in_holdout(clip_name: str, fraction: float) -> bool:
+    """Deterministic held-out split by clip directory name: stable across runs and
+    machines, and adding clips never moves existing ones between splits.
+    """
+    h = int.from_bytes(hashlib.sha1(clip_name.encode()).digest()[:8], "big")
+    return h / 2 ** 64 < fraction
+
+
+def _in_split(clip_name: str, split: str, holdout: float) -> bool:
+    if split not in SPLITS:
+        raise ValueError(f"Unknown split '{split}', expected one of {SPLITS}")
+    return split == "all" or in_holdout(clip_name, holdout) == (split == "holdout")
+
+
+def _fingerprint(clip_dirs: List[Path], target_frames: int, img_size: Tuple[int, int]) -> str:
+    """Hash of the cache format, its parameters and the source frame list (names, sizes, mtimes)."""
+    h = hashlib.sha1(f"v2|{target_frames}|{tuple(img_size)}".encode())
+    for clip in clip_dirs:
+        h.update(clip.name.encode())
+        for p in sorted(clip.glob("*.png")):
+            st = p.stat()
+            h.update(f"|{p.name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def compile_clip_cache(cropped_root: Path,
+                       viseme_class: str,
+                       cache_dir: Path,
+                       target_frames: int = 3,
+                       img_size: Tuple[int, int] = (64, 64)) -> Path:
+    """Pack every clip of a viseme class into one uint8 .npy of shape (N, T, H, W, 3).
+
+    The file name carries a fingerprint of target_frames, img_size and the source PNG
+    list, so any change produces a new cache; older caches of the class with the same
+    target_frames and img_size are removed.
+    Returns the path of the (possibly pre-existing) cache.
     """
     class_dir = Path(cropped_root) / viseme_class
     if not class_dir.exists() or not class_dir.is_dir():
         raise FileNotFoundError(f"{class_dir} not found")
 
-    clip_dirs = [p for p in class_dir.iterdir() if p.is_dir()]
+    clip_dirs = _clip_dirs(class_dir)
+    fp = _fingerprint(clip_dirs, target_frames, img_size)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{viseme_class}_{fp}.npy"
+    meta_path = path.with_suffix(".json")
+    if path.exists() and meta_path.exists():
+        return path
+
+    shape = (len(clip_dirs), target_frames, img_size[0], img_size[1], 3)
+    tmp = path.with_name(path.stem + f".{os.getpid()}.tmp.npy")
+    arr = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint8, shape=shape)
+    names = []
+    for clip in clip_dirs:
+        clip_arr = _load_clip_uint8(clip, target_frames, img_size)
+        if clip_arr is not None:
+            arr[len(names)] = clip_arr
+            names.append(clip.name)
+    arr.flush()
+    del arr
+    os.replace(tmp, path)
+    meta_path.write_text(json.dumps({"count": len(names), "target_frames": target_frames,
+                                     "img_size": list(img_size), "fingerprint": fp,
+                                     "clips": names}), encoding="utf-8")
+
+    for old in cache_dir.glob(f"{viseme_class}_*.npy"):
+        if old != path and len(old.stem) == len(path.stem) and _same_format(old, target_frames, img_size):
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+    return path
+
+
+def _same_format(cache_path: Path, target_frames: int, img_size: Tuple[int, int]) -> bool:
+    """Whether an existing cache was built with these parameters (an outdated copy of the
+    same data). Caches at other sizes, e.g. progressive-training stages, are kept.
+    """
+    try:
+        meta = json.loads(cache_path.with_suffix(".json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return True  # no readable metadata: a leftover, safe to remove
+    return meta.get("target_frames") == target_frames and meta.get("img_size") == list(img_size)
+
+
+def load_clip_cache(cropped_root: Path,
+                    viseme_class: str,
+                    cache_dir: Path,
+                    target_frames: int = 3,
+                    img_size: Tuple[int, int] = (64, 64)) -> np.ndarray:
+    """Memory-map the clip cache of a viseme class, compiling it first if stale or missing.
+    Returns a read-only uint8 array (N, T, H, W, 3) of the non-empty clips.
+    """
+    return _load_cache(cropped_root, viseme_class, cache_dir, target_frames, img_size)[0]
+
+
+def _load_cache(cropped_root, viseme_class, cache_dir, target_frames, img_size) -> Tuple[np.ndarray, List[str]]:
+    """load_clip_cache plus the clip directory name of each row."""
+    path = compile_clip_cache(cropped_root, viseme_class, cache_dir, target_frames, img_size)
+    meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+    return np.load(path, mmap_mode="r")[:meta["count"]], meta["clips"]
+
+
+def _frame_indices(n: tf.Tensor, target_frames: int) -> tf.Tensor:
+    """Graph version of _load_clip's temporal pad / subsample for a clip of n >= 1 frames."""
+    i = tf.range(target_frames)
+    pad = tf.minimum(i, n - 1)  # repeat the last frame
+    sub = (i * (n - 1)) // max(target_frames - 1, 1)  # floor(linspace(0, n - 1, T))
+    return tf.where(n < target_frames, pad, sub)
+
 
+def _png_clip_dataset(clip_dirs: List[Path], target_frames: int, img_size: Tuple[int, int],
+                      shuffle: bool = True, seed: Optional[int] = None) -> tf.data.Dataset:
+    """Native tf.data pipeline: clip directory listing in, uint8 clips (T, H, W, 3) out.
+
+    Frame files are listed once up front; the clip list is fully reshuffled every
+    epoch, clips are read with a parallel interleave and frames decoded in the graph. A clip with an undecodable frame is
+    dropped (the Python loader skipped just that frame). With a `seed` the clip order
+    is reproducible (seeded shuffle, deterministic interleave).
+    """
+    listing = [[str(p) for p in sorted(clip.glob("*.png"))] for clip in clip_dirs]
+    listing = [files for files in listing if files]
+    if not listing:
+        raise ValueError("No PNG frames found in any clip directory")
+    files = tf.ragged.constant(listing, dtype=tf.string)
+    ds = tf.data.Dataset.from_tensor_slices(files)
+    if shuffle:
+        ds = ds.shuffle(len(listing), seed=seed, reshuffle_each_iteration=True)
+
+    def _decode(path):
+        img = tf.io.decode_png(tf.io.read_file(path), channels=3)
+        img = tf.image.resize(img, img_size, method="bicubic", antialias=True)
+        return tf.cast(tf.clip_by_value(tf.round(img), 0.0, 255.0), tf.uint8)
+
+    def _clip(files):
+        picked = tf.gather(files, _frame_indices(tf.size(files), target_frames))
+        frames = tf.data.Dataset.from_tensor_slices(picked).map(_decode, num_parallel_calls=tf.data.AUTOTUNE)
+        return frames.ignore_errors().batch(target_frames, drop_remainder=True)
+
+    return ds.interleave(_clip, cycle_length=tf.data.AUTOTUNE, num_parallel_calls=tf.data.AUTOTUNE,
+                         deterministic=seed is not None)
+
+
+def _generator_dataset(clip_dirs: List[Path], target_frames: int, img_size: Tuple[int, int]) -> tf.data.Dataset:
+    """Python-generator pipeline (PIL decode, one clip at a time); kept for benchmarking."""
     def gen():
         for clip in clip_dirs:
             clip_arr = _load_clip(clip, target_frames, img_size)
@@ -54,6 +204,143 @@ def make_dataset(cropped_root: Path,
                 yield clip_arr
 
     output_signature = tf.TensorSpec(shape=(target_frames, img_size[0], img_size[1], 3), dtype=tf.float32)
-    ds = tf.data.Dataset.from_generator(gen, output_signature=output_signature)
-    ds = ds.shuffle(100).batch(batch_size).prefetch(tf.data.AUTOTUNE)
-    return ds
+    return tf.data.Dataset.from_generator(gen, output_signature=output_signature).shuffle(100)
+
+
+def _class_clip_dataset(cropped_root: Path,
+                        viseme_class: str,
+                        target_frames: int,
+                        img_size: Tuple[int, int],
+                        cache_dir: Optional[Path] = None,
+                        split: str = "all",
+                        holdout: float = 0.0,
+                        shuffle: bool = True,
+                        seed: Optional[int] = None) -> Tuple[tf.data.Dataset, int]:
+    """Unbatched uint8 clips (T, H, W, 3) of one split of a viseme class, plus the clip
+    count. A `seed` makes the shuffled order reproducible.
+    """
+    class_dir = Path(cropped_root) / viseme_class
+    if not class_dir.exists() or not class_dir.is_dir():
+        raise FileNotFoundError(f"{class_dir} not found")
+
+    if cache_dir is not None:
+        clips, names = _load_cache(cropped_root, viseme_class, cache_dir, target_frames, img_size)
+        idx = np.array([i for i, name in enumerate(names) if _in_split(name, split, holdout)], dtype=np.int64)
+        if len(idx) == 0:
+            raise ValueError(f"No usable {split} clips in {class_dir}")
+        clip_shape = clips.shape[1:]
+        ds = tf.data.Dataset.from_tensor_slices(idx)
+        if shuffle:
+            ds = ds.shuffle(len(idx), seed=seed, reshuffle_each_iteration=True)
+        ds = ds.map(lambda i: tf.ensure_shape(tf.numpy_function(lambda j: clips[j], [i], tf.uint8), clip_shape))
+        return ds, len(idx)
+
+    clip_dirs = [c for c in _clip_dirs(class_dir) if _in_split(c.name, split, holdout)]
+    if not clip_dirs:
+        raise ValueError(f"No {split} clips in {class_dir}")
+    return _png_clip_dataset(clip_dirs, target_frames, img_size, shuffle=shuffle, seed=seed), len(clip_dirs)
+
+
+def make_dataset(cropped_root: Path,
+                 viseme_class: str,
+                 batch_size: int = 16,
+                 target_frames: int = 3,
+                 img_size: Tuple[int, int] = (64, 64),
+                 cache_dir: Optional[Path] = None,
+                 split: str = "all",
+                 holdout: float = 0.0) -> tf.data.Dataset:
+    """Create a tf.data.Dataset for a single viseme class. Yields batches of shape
+       (B, T, H, W, 3) dtype uint8 in [0, 255]; scaling to [-1, 1] happens in the
+       model step (lipgans.utils.image.to_model_range).
+
+       PNGs are decoded by a native parallel tf.data pipeline. With `cache_dir`,
+       clips are read straight from the memory-mapped uint8 cache (see
+       compile_clip_cache) instead.
+
+       `split` "train" / "holdout" keeps the clips outside / inside the deterministic
+       held-out fraction `holdout` (see in_holdout); "all" keeps every clip.
+    """
+    ds, _ = _class_clip_dataset(cropped_root, viseme_class, target_frames, img_size, cache_dir, split, holdout)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def make_repeated_dataset(cropped_root: Path,
+                          viseme_class: str,
+                          batch_size: int = 16,
+                          target_frames: int = 3,
+                          img_size: Tuple[int, int] = (64, 64),
+                          cache_dir: Optional[Path] = None,
+                          split: str = "all",
+                          holdout: float = 0.0,
+                          seed: Optional[int] = None) -> Tuple[tf.data.Dataset, int]:
+    """make_dataset as an infinite stream of full batches, plus the number of batches
+    in one pass over the clips (steps per epoch).
+
+    For multi-worker training: every worker runs the same number of steps, and with
+    the same `seed` every worker sees the same clip order, so sharding the stream by
+    element (AutoShardPolicy.DATA) gives each worker a disjoint part of every batch.
+    """
+    ds, n = _class_clip_dataset(cropped_root, viseme_class, target_frames, img_size, cache_dir, split, holdout,
+                                seed=seed)
+    steps_per_epoch = max(1, n // batch_size)
+    return ds.repeat().batch(batch_size, drop_remainder=True).prefetch(tf.data.AUTOTUNE), steps_per_epoch
+
+
+def load_split_clips(cropped_root: Path,
+                     viseme_class: str,
+                     target_frames: int = 3,
+                     img_size: Tuple[int, int] = (64, 64),
+                     cache_dir: Optional[Path] = None,
+                     split: str = "holdout",
+                     holdout: float = 0.1,
+                     max_clips: Optional[int] = None) -> np.ndarray:
+    """First `max_clips` clips of a split, in a fixed order, as one uint8 array (N, T, H, W, 3)."""
+    ds, n = _class_clip_dataset(cropped_root, viseme_class, target_frames, img_size, cache_dir, split, holdout,
+                                shuffle=False)
+    n = min(n, max_clips) if max_clips else n
+    return np.concatenate([b.numpy() for b in ds.take(n).batch(64)], axis=0)
+
+
+def viseme_classes(cropped_root: Path) -> List[str]:
+    """Sorted names of the viseme class directories under cropped_root."""
+    return sorted(p.name for p in Path(cropped_root).iterdir() if p.is_dir())
+
+
+def make_conditional_dataset(cropped_root: Path,
+                             classes: List[str],
+                             batch_size: int = 16,
+                             target_frames: int = 3,
+                             img_size: Tuple[int, int] = (64, 64),
+                             cache_dir: Optional[Path] = None,
+                             split: str = "all",
+                             holdout: float = 0.0,
+                             seed: Optional[int] = None) -> Tuple[tf.data.Dataset, int]:
+    """Class-balanced dataset over several viseme classes for ConditionalVisemeGAN.
+
+    Yields (clips, viseme_ids) batches: uint8 (B, T, H, W, 3) and int32 (B,), where a
+    viseme id is the index of its class in `classes`. Each class is repeated and
+    sampled with equal probability, so the stream is infinite; the second return
+    value is the number of batches in one pass over the data (steps per epoch).
+    Classes without usable clips are skipped with a warning. A `seed` makes the
+    stream reproducible (see make_repeated_dataset).
+    """
+    per_class, total = [], 0
+    for i, viseme in enumerate(classes):
+        try:
+            ds, n = _class_clip_dataset(cropped_root, viseme, target_frames, img_size, cache_dir, split, holdout,
+                                        seed=seed)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"⚠️ Skipping {viseme}: {e}")
+            continue
+        if n == 0:
+            print(f"⚠️ Skipping {viseme}: no clips")
+            continue
+        label = tf.constant(i, tf.int32)
+        per_class.append(ds.repeat().map(lambda clip, label=label: (clip, label)))
+        total += n
+    if not per_class:
+        raise ValueError(f"No usable viseme classes in {cropped_root}")
+
+    ds = tf.data.Dataset.sample_from_datasets(per_class, weights=[1.0 / len(per_class)] * len(per_class), seed=seed)
+    steps_per_epoch = max(1, total // batch_size)
+    return ds.batch(batch_size, drop_remainder=True).prefetch(tf.data.AUTOTUNE), steps_per_epoch
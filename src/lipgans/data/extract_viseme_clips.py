@@ -1,9 +1,79 @@
+import time
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 import cv2
+from tqdm import tqdm
 
-from .mlf_parser import parse_mlf_for_record
+from .mlf_parser import MLFIndex, parse_mlf_for_record
 from ..phonemes import PHONEME_TO_VISEME
+from ..utils.parallel import map_isolated, resolve_workers
+from ..utils.writer import ImageWriter
+
+# Per-process PNG writer, created by _init_worker
+_WORKER_WRITER: Optional[ImageWriter] = None
+
+
+@dataclass
+class ExtractStats:
+    """Per-video extraction counters."""
+    frames_decoded: int = 0   # cap.read()/cap.grab() calls that returned a frame
+    frames_written: int = 0   # PNGs written (a frame shared by overlapping segments counts once per segment)
+    seeks: int = 0            # cap.set(CAP_PROP_POS_FRAMES) calls
+
+
+@dataclass
+class _Segment:
+    index: int
+    phoneme: str
+    viseme: str
+    start_frame: int
+    end_frame: int
+
+
+def _frame_segments(segments: Iterable[Tuple[float, float, str]], video_fps: float) -> List[_Segment]:
+    """Convert (start_s, end_s, phoneme) segments to frame ranges, dropping unmapped phonemes."""
+    out = []
+    for i, (start_s, end_s, phon) in enumerate(segments):
+        viseme = PHONEME_TO_VISEME.get(phon)
+        if not viseme or end_s <= start_s:
+            continue
+        out.append(_Segment(i, phon, viseme, int(start_s * video_fps), int(end_s * video_fps)))
+    return out
+
+
+def iter_segment_frames(cap, segs: List[_Segment], stats: ExtractStats) -> Iterator[Tuple[int, object, Tuple[_Segment, ...]]]:
+    """
+    Decode `cap` once, front to back, and yield (frame_idx, frame, covering_segments)
+    for every frame covered by at least one segment.
+
+    Frames outside all segments are only grabbed (no colour conversion / retrieve),
+    and decoding stops after the last segment ends.
+    """
+    if not segs:
+        return
+    order = sorted(segs, key=lambda s: s.start_frame)
+    last_frame = max(s.end_frame for s in order)
+    active: List[_Segment] = []
+    nxt = 0
+
+    for f_idx in range(last_frame):
+        while nxt < len(order) and order[nxt].start_frame <= f_idx:
+            active.append(order[nxt])
+            nxt += 1
+        active = [s for s in active if s.end_frame > f_idx]
+
+        if not cap.grab():
+            break
+        stats.frames_decoded += 1
+        if not active:
+            continue
+
+        ret, frame = cap.retrieve()
+        if not ret:
+            break
+        yield f_idx, frame, tuple(active)  # snapshot: consumers may hold on to it past the next frame
 
 
 def extract_frames_from_video(
@@ -11,8 +81,10 @@ def extract_frames_from_video(
     segments: Iterable[Tuple[float, float, str]],
     out_dir: Path,
     frame_size: Tuple[int, int] = (64, 64),
-    fps: float = 25.0
-):
+    fps: float = 25.0,
+    sequential: bool = False,
+    writer: Optional[ImageWriter] = None,
+) -> ExtractStats:
     """
     Extract viseme-aligned frames from a video.
 
@@ -22,37 +94,77 @@ def extract_frames_from_video(
         out_dir (Path): Root directory to save frames (viseme subfolders will be created)
         frame_size (Tuple[int,int]): Resize frames to this size (default 64x64)
         fps (float): Number of frames per second to extract
+        sequential (bool): Decode the video once, front to back, and route each frame to
+            every segment covering it instead of seeking to the start of each segment.
+        writer (ImageWriter): Background PNG writer to use; a private one is created
+            (and closed) when omitted. It is flushed before returning.
+
+    Returns:
+        ExtractStats: frames decoded / written and seeks performed. In sequential mode
+        `frames_decoded` never exceeds the number of source frames.
     """
+    stats = ExtractStats()
     out_dir.mkdir(parents=True, exist_ok=True)
 
     cap = cv2.VideoCapture(str(input_video))
     if not cap.isOpened():
         print(f"⚠️ Cannot open video: {input_video}")
-        return
+        return stats
 
     video_fps = cap.get(cv2.CAP_PROP_FPS) or fps
-    for i, (start_s, end_s, phon) in enumerate(segments):
-        viseme = PHONEME_TO_VISEME.get(phon)
-        if not viseme or end_s <= start_s:
-            continue
-
-        vis_dir = out_dir / viseme / input_video.stem
-        vis_dir.mkdir(parents=True, exist_ok=True)
-
-        # Compute frame indices
-        start_frame = int(start_s * video_fps)
-        end_frame = int(end_s * video_fps)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-
-        for f_idx in range(start_frame, end_frame):
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frame = cv2.resize(frame, frame_size)
-            out_file = vis_dir / f"{i:04d}_{f_idx - start_frame:02d}_{phon}.png"
-            cv2.imwrite(str(out_file), frame)
-
-    cap.release()
+    segs = _frame_segments(segments, video_fps)
+    for seg in segs:
+        (out_dir / seg.viseme / input_video.stem).mkdir(parents=True, exist_ok=True)
+
+    own_writer = writer is None
+    if own_writer:
+        writer = ImageWriter()
+
+    def _write(frame, seg: _Segment, f_idx: int):
+        out_file = out_dir / seg.viseme / input_video.stem / f"{seg.index:04d}_{f_idx - seg.start_frame:02d}_{seg.phoneme}.png"
+        writer.write(out_file, frame)
+        stats.frames_written += 1
+
+    try:
+        if sequential:
+            for f_idx, frame, covering in iter_segment_frames(cap, segs, stats):
+                frame = cv2.resize(frame, frame_size)
+                for seg in covering:
+                    _write(frame, seg, f_idx)
+        else:
+            for seg in segs:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, seg.start_frame)
+                stats.seeks += 1
+
+                for f_idx in range(seg.start_frame, seg.end_frame):
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    stats.frames_decoded += 1
+                    _write(cv2.resize(frame, frame_size), seg, f_idx)
+    finally:
+        cap.release()
+        if own_writer:
+            writer.close()
+        else:
+            writer.flush()
+    return stats
+
+
+def _init_worker(writer_kwargs: dict):
+    global _WORKER_WRITER
+    _WORKER_WRITER = ImageWriter(**writer_kwargs)
+
+
+def _extract_one(mp4: Path, mlf_path: Path, viseme_out: Path, record_prefix: str,
+                 frame_size: Tuple[int, int], fps: float, sequential: bool) -> Optional[ExtractStats]:
+    """Extract a single video; returns None when the MLF has no segments for it."""
+    target_rec = record_prefix + f"{mp4.stem}.rec"
+    segs = parse_mlf_for_record(mlf_path, target_rec)
+    if not segs:
+        return None
+    return extract_frames_from_video(mp4, segs, viseme_out, frame_size, fps, sequential=sequential,
+                                     writer=_WORKER_WRITER)
 
 
 def extract_all_frames_from_dir(
@@ -61,21 +173,55 @@ def extract_all_frames_from_dir(
     viseme_out: Path,
     record_prefix: str = "",
     frame_size: Tuple[int,int] = (64, 64),
-    fps: float = 25.0
+    fps: float = 25.0,
+    sequential: bool = False,
+    workers: int = 1,
+    writer_kwargs: Optional[dict] = None,
 ):
     """
     Extract frames for all videos in a directory.
+
+    Args:
+        workers (int): Number of processes to fan videos out to (0 = one per CPU core).
+            A failure in one video is reported and does not stop the others.
+        writer_kwargs (dict): ImageWriter options (threads, max_pending, png_compression)
+            for the per-process background PNG writer.
+
+    Returns:
+        ExtractStats: counters summed over all successfully extracted videos.
     """
     viseme_out.mkdir(parents=True, exist_ok=True)
-
-    for mp4 in raw_videos.glob("*.mp4"):
-        target_rec = record_prefix + f"{mp4.stem}.rec"
-        segs = parse_mlf_for_record(mlf_path, target_rec)
-        if not segs:
-            print(f"⚠️ No segments found for {mp4.name}")
+    # Build (or validate) the MLF sidecar index once, before workers start looking records up
+    MLFIndex.load(mlf_path)
+    videos = sorted(raw_videos.glob("*.mp4"))
+    workers = resolve_workers(workers)
+    total = ExtractStats()
+    done, failed = 0, []
+
+    job = partial(_extract_one, mlf_path=mlf_path, viseme_out=viseme_out, record_prefix=record_prefix,
+                  frame_size=frame_size, fps=fps, sequential=sequential)
+    t0 = time.perf_counter()
+    results = map_isolated(job, videos, workers=workers, initializer=_init_worker, initargs=(writer_kwargs or {},))
+    for res in tqdm(results, total=len(videos), desc="Videos"):
+        if not res.ok:
+            failed.append(res)
+            print(f"❌ {res.item.name}: {res.error}")
+            continue
+        if res.value is None:
+            print(f"⚠️ No segments found for {res.item.name}")
             continue
+        done += 1
+        total.frames_decoded += res.value.frames_decoded
+        total.frames_written += res.value.frames_written
+        total.seeks += res.value.seeks
+    elapsed = max(time.perf_counter() - t0, 1e-9)
 
-        extract_frames_from_video(mp4, segs, viseme_out, frame_size, fps)
+    print(f"[INFO] {done}/{len(videos)} videos in {elapsed:.1f}s with {workers} worker(s) | "
+          f"{done / elapsed:.2f} videos/s, {total.frames_decoded / elapsed:.1f} frames/s decoded")
+    print(f"[INFO] frames decoded={total.frames_decoded} written={total.frames_written} seeks={total.seeks}")
+    if failed:
+        print(f"⚠️ {len(failed)} video(s) failed: {', '.join(r.item.name for r in failed)}")
+    return total
 
 
 # Example Usage
@@ -84,5 +230,10 @@ def extract_all_frames_from_dir(
 #     mlf_path=Path("alignments/all.mlf"),
 #     viseme_out=Path("data/viseme_clips"),
 #     frame_size=(64,64),
-#     fps=25.0
+#     fps=25.0,
+#     sequential=True,   # decode each video once instead of seeking per segment
+#     workers=32,        # one process per video, failures isolated
 # )
+#
+# stats = extract_frames_from_video(mp4, segs, out, sequential=True)
+# print(stats.frames_decoded, stats.frames_written, stats.seeks)
@@ -1,9 +1,36 @@
+import json
+import mmap
+import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 # HTK MLF times are in 100 ns units
 TIME_SCALE = 1e7
 
+# Sidecar files written next to the MLF by MLFIndex.build
+INDEX_SUFFIX = ".idx.npy"
+META_SUFFIX = ".idx.json"
+INDEX_VERSION = 1
+
+
+def _parse_label(line: str) -> Optional[Tuple[int, int, str]]:
+    """Parse a `start end phoneme` label line; returns None for anything else (incl. silence)."""
+    parts = line.split()
+    if len(parts) != 3:
+        return None
+    try:
+        start, end = int(parts[0]), int(parts[1])
+    except ValueError:
+        return None
+    phon = parts[2].lower()
+    if phon == "sil":  # Skip silence
+        return None
+    return start, end, phon
+
 
 def parse_mlf(mlf_path: Path) -> Dict[str, List[Tuple[float, float, str]]]:
     """
@@ -19,50 +46,232 @@ def parse_mlf(mlf_path: Path) -> Dict[str, List[Tuple[float, float, str]]]:
                 ...
             }
     """
-    lines = Path(mlf_path).read_text(encoding="utf-8", errors="ignore").splitlines()
-
     records: Dict[str, List[Tuple[float, float, str]]] = {}
     current_rec = None
     out: List[Tuple[float, float, str]] = []
 
-    for line in lines:
-        line = line.strip()
+    with open(mlf_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+
+            if line.startswith('"'):  # Start of new record
+                if current_rec and out:  # save previous
+                    records[current_rec] = out
+                current_rec = Path(line.strip('"')).stem  # use filename stem as key
+                out = []
+                continue
 
-        if line.startswith('"'):  # Start of new record
-            if current_rec and out:  # save previous
-                records[current_rec] = out
-            current_rec = Path(line.strip('"')).stem  # use filename stem as key
-            out = []
-            continue
+            if line == ".":  # End of record
+                if current_rec and out:
+                    records[current_rec] = out
+                current_rec, out = None, []
+                continue
 
-        if line == ".":  # End of record
-            if current_rec and out:
-                records[current_rec] = out
-            current_rec, out = None, []
-            continue
+            label = _parse_label(line)
+            if label is not None:
+                start, end, phon = label
+                out.append((start / TIME_SCALE, end / TIME_SCALE, phon))
 
-        parts = line.split()
-        if len(parts) == 3:
-            try:
-                start, end = int(parts[0]), int(parts[1])
-                phon = parts[2].lower()
+    return records
 
-                if phon == "sil":  # Skip silence
-                    continue
 
-                out.append((start / TIME_SCALE, end / TIME_SCALE, phon))
+@dataclass
+class MLFSegments:
+    """
+    Phoneme timings of one record as parallel arrays.
+
+    Iterating yields (start_s, end_s, phoneme) tuples, so it can be passed anywhere
+    a list from `parse_mlf` is accepted.
+    """
+    start: np.ndarray     # float64 seconds
+    end: np.ndarray       # float64 seconds
+    phone_id: np.ndarray  # int16 index into `phones`
+    phones: Tuple[str, ...]
+
+    @staticmethod
+    def empty() -> "MLFSegments":
+        return MLFSegments(np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int16), ())
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __iter__(self) -> Iterator[Tuple[float, float, str]]:
+        for s, e, p in zip(self.start.tolist(), self.end.tolist(), self.phone_id.tolist()):
+            yield s, e, self.phones[p]
+
+
+class MLFIndex:
+    """
+    Byte-offset index over an HTK MLF.
+
+    `build` makes one streaming pass over the MLF and records, per record, the byte
+    range of its label lines. The table is saved as a structured `.npy` sidecar
+    (opened with mmap_mode="r") plus a small JSON file holding the phoneme vocabulary
+    and the MLF size/mtime used to detect a stale index. `get` then reads and parses
+    only the bytes of the requested record.
+    """
+
+    def __init__(self, mlf_path: Path, table: np.ndarray, phones: List[str]):
+        self.mlf_path = Path(mlf_path)
+        self.table = table
+        self.phones = tuple(phones)
+        self._phone_ids = {p: i for i, p in enumerate(self.phones)}
+        self._rows: Optional[Dict[str, int]] = None
+        self._mm: Optional[mmap.mmap] = None
 
-            except ValueError:
+    @staticmethod
+    def sidecar_paths(mlf_path: Path) -> Tuple[Path, Path]:
+        mlf_path = Path(mlf_path)
+        return (mlf_path.with_name(mlf_path.name + INDEX_SUFFIX),
+                mlf_path.with_name(mlf_path.name + META_SUFFIX))
+
+    @classmethod
+    def build(cls, mlf_path: Path, save: bool = True) -> "MLFIndex":
+        """Index `mlf_path` in a single streaming pass, optionally writing the sidecar files."""
+        mlf_path = Path(mlf_path)
+        names: List[bytes] = []
+        offsets: List[int] = []
+        lengths: List[int] = []
+        counts: List[int] = []
+        phones: Dict[str, int] = {}
+
+        current, start, n = None, 0, 0
+
+        def _close(end_offset: int):
+            if current and n:
+                names.append(current.encode("utf-8"))
+                offsets.append(start)
+                lengths.append(end_offset - start)
+                counts.append(n)
+
+        pos = 0
+        with open(mlf_path, "rb") as f:
+            for raw in f:
+                line = raw.decode("utf-8", errors="ignore").strip()
+                if line.startswith('"'):
+                    _close(pos)
+                    current, start, n = Path(line.strip('"')).stem, pos + len(raw), 0
+                elif line == ".":
+                    _close(pos)
+                    current, n = None, 0
+                elif current:
+                    label = _parse_label(line)
+                    if label is not None:
+                        phones.setdefault(label[2], len(phones))
+                        n += 1
+                pos += len(raw)
+        _close(pos)
+
+        width = max([len(b) for b in names] + [1])
+        table = np.zeros(len(names), dtype=[("name", f"S{width}"), ("offset", "<i8"),
+                                            ("length", "<i8"), ("count", "<i4")])
+        table["name"] = names
+        table["offset"] = offsets
+        table["length"] = lengths
+        table["count"] = counts
+        vocab = sorted(phones, key=phones.get)
+
+        if save:
+            idx_path, meta_path = cls.sidecar_paths(mlf_path)
+            st = mlf_path.stat()
+            tmp = idx_path.with_name(idx_path.name + f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as fh:
+                np.save(fh, table)
+            os.replace(tmp, idx_path)
+            meta = {"version": INDEX_VERSION, "mlf_size": st.st_size,
+                    "mlf_mtime_ns": st.st_mtime_ns, "phones": vocab}
+            tmp = meta_path.with_name(meta_path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, meta_path)
+
+        return cls(mlf_path, table, vocab)
+
+    @classmethod
+    def load(cls, mlf_path: Path, rebuild: bool = True) -> "MLFIndex":
+        """Open the sidecar index memory-mapped, (re)building it if missing or stale."""
+        mlf_path = Path(mlf_path)
+        idx_path, meta_path = cls.sidecar_paths(mlf_path)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            st = mlf_path.stat()
+            fresh = (meta.get("version") == INDEX_VERSION and meta["mlf_size"] == st.st_size
+                     and meta["mlf_mtime_ns"] == st.st_mtime_ns and idx_path.exists())
+        except (OSError, ValueError, KeyError):
+            fresh = False
+
+        if not fresh:
+            if not rebuild:
+                raise FileNotFoundError(f"No up-to-date MLF index for {mlf_path}")
+            return cls.build(mlf_path)
+        return cls(mlf_path, np.load(idx_path, mmap_mode="r"), meta["phones"])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, record: str) -> bool:
+        return Path(record).stem in self._row_map()
+
+    def _row_map(self) -> Dict[str, int]:
+        if self._rows is None:
+            # later duplicates win, as in parse_mlf
+            self._rows = {name.decode("utf-8"): i for i, name in enumerate(self.table["name"].tolist())}
+        return self._rows
+
+    def _bytes(self, offset: int, length: int) -> bytes:
+        if self._mm is None:
+            with open(self.mlf_path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm[offset:offset + length]
+
+    def get(self, record: str) -> Optional[MLFSegments]:
+        """Return the segments of `record` (matched by filename stem), or None if absent."""
+        row = self._row_map().get(Path(record).stem)
+        if row is None:
+            return None
+        entry = self.table[row]
+        n = int(entry["count"])
+        start = np.empty(n, dtype=np.float64)
+        end = np.empty(n, dtype=np.float64)
+        phone_id = np.empty(n, dtype=np.int16)
+
+        k = 0
+        text = self._bytes(int(entry["offset"]), int(entry["length"])).decode("utf-8", errors="ignore")
+        for line in text.splitlines():
+            label = _parse_label(line.strip())
+            if label is None or k >= n:
                 continue
+            start[k] = label[0] / TIME_SCALE
+            end[k] = label[1] / TIME_SCALE
+            phone_id[k] = self._phone_ids[label[2]]
+            k += 1
+        return MLFSegments(start[:k], end[:k], phone_id[:k], self.phones)
 
-    return records
+
+@lru_cache(maxsize=8)
+def _cached_index(mlf_path: str) -> MLFIndex:
+    return MLFIndex.load(Path(mlf_path))
+
+
+def parse_mlf_for_record(mlf_path: Path, target_rec: str) -> MLFSegments:
+    """
+    Return the phoneme timings of a single record (matched by filename stem), or
+    empty segments if the record is not in the MLF.
+
+    The MLF is indexed once per process (see MLFIndex), so repeated lookups only
+    read the bytes of the requested record.
+    """
+    return _cached_index(str(Path(mlf_path).resolve())).get(target_rec) or MLFSegments.empty()
 
 
 # Example Usage
 # records = parse_mlf(Path("aligned.mlf"))
 
-# print(len(records))  
+# print(len(records))
 # # e.g., 1342 records
 
-# print(records["s001_001"][:5])  
+# print(records["s001_001"][:5])
 # # [(0.0, 0.12, 'hh'), (0.12, 0.20, 'ah'), (0.20, 0.35, 'l'), (0.35, 0.50, 'ow')]
+
+# index = MLFIndex.load(Path("aligned.mlf"))   # builds aligned.mlf.idx.npy / .idx.json once
+# segs = index.get("s001_001")
+# segs.start[:4], segs.end[:4], [segs.phones[i] for i in segs.phone_id[:4]]
@@ -0,0 +1,160 @@
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+import cv2
+from tqdm import tqdm
+
+from .crop_mouth import MouthCropper, _init_worker, _worker_cropper, _worker_writer
+from .extract_viseme_clips import ExtractStats, _frame_segments, iter_segment_frames
+from .mlf_parser import MLFIndex, parse_mlf_for_record
+from ..utils.parallel import map_isolated, resolve_workers
+from ..utils.writer import ImageWriter
+
+
+@dataclass
+class PreprocessStats:
+    """Per-video counters for the fused extract-and-crop stage."""
+    frames_decoded: int = 0
+    frames_written: int = 0
+    no_face: int = 0   # covered frames where no mouth box was found
+    clips: int = 0     # segment clip directories written
+
+
+def clip_name(video_stem: str, seg_index: int, phoneme: str) -> str:
+    """Name of the per-segment clip directory under cropped_dir/<viseme>/."""
+    return f"{video_stem}_{seg_index:04d}_{phoneme}"
+
+
+def preprocess_video(
+    input_video: Path,
+    segments: Iterable[Tuple[float, float, str]],
+    cropped_dir: Path,
+    cropper: MouthCropper,
+    img_size: Tuple[int, int] = (64, 64),
+    fps: float = 25.0,
+    writer: Optional[ImageWriter] = None,
+) -> PreprocessStats:
+    """
+    Decode a raw video once and write mouth crops for every MLF segment.
+
+    Each covered frame is cropped at source resolution, resized to `img_size` and
+    written to cropped_dir/<viseme>/<video>_<seg>_<phoneme>/<frame>.png, the layout
+    `make_dataset` reads. Frames shared by overlapping segments are cropped once.
+    PNGs go through `writer` (a private ImageWriter when omitted) and are flushed
+    before returning.
+    """
+    stats = PreprocessStats()
+    cap = cv2.VideoCapture(str(input_video))
+    if not cap.isOpened():
+        print(f"⚠️ Cannot open video: {input_video}")
+        return stats
+
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    segs = _frame_segments(segments, video_fps)
+    decode = ExtractStats()
+    made = set()
+    cropper.reset()
+    own_writer = writer is None
+    if own_writer:
+        writer = ImageWriter()
+
+    frames = (((f_idx, covering), frame) for f_idx, frame, covering in iter_segment_frames(cap, segs, decode))
+    try:
+        for (f_idx, covering), roi in cropper.crop_stream(frames):
+            if roi is None:
+                stats.no_face += 1
+                continue
+            roi = cv2.resize(roi, img_size)
+            for seg in covering:
+                clip_dir = cropped_dir / seg.viseme / clip_name(input_video.stem, seg.index, seg.phoneme)
+                if clip_dir not in made:
+                    clip_dir.mkdir(parents=True, exist_ok=True)
+                    made.add(clip_dir)
+                writer.write(clip_dir / f"{f_idx - seg.start_frame:04d}.png", roi)
+                stats.frames_written += 1
+    finally:
+        cap.release()
+        if own_writer:
+            writer.close()
+        else:
+            writer.flush()
+
+    stats.frames_decoded = decode.frames_decoded
+    stats.clips = len(made)
+    return stats
+
+
+def _preprocess_one(mp4: Path, mlf_path: Path, cropped_dir: Path, record_prefix: str,
+                    img_size: Tuple[int, int], fps: float) -> Optional[PreprocessStats]:
+    segs = parse_mlf_for_record(mlf_path, record_prefix + f"{mp4.stem}.rec")
+    if not segs:
+        return None
+    return preprocess_video(mp4, segs, cropped_dir, _worker_cropper(), img_size, fps, writer=_worker_writer())
+
+
+def preprocess_all(
+    raw_videos: Path,
+    mlf_path: Path,
+    cropped_dir: Path,
+    record_prefix: str = "",
+    img_size: Tuple[int, int] = (64, 64),
+    fps: float = 25.0,
+    workers: int = 1,
+    detect_every: int = 1,
+    detect_scale: float = 1.0,
+    smoothing: float = 0.0,
+    writer_kwargs: Optional[dict] = None,
+) -> PreprocessStats:
+    """
+    Fused replacement for extract_all_frames_from_dir + crop_all_frames: raw videos
+    in, training-ready mouth crops out, without intermediate full-face frames.
+
+    Each worker process owns one MouthCropper and one ImageWriter (`writer_kwargs`);
+    failures are isolated per video.
+    """
+    cropped_dir.mkdir(parents=True, exist_ok=True)
+    MLFIndex.load(mlf_path)
+    videos = sorted(raw_videos.glob("*.mp4"))
+    workers = resolve_workers(workers)
+    total = PreprocessStats()
+    done, failed = 0, []
+
+    job = partial(_preprocess_one, mlf_path=mlf_path, cropped_dir=cropped_dir, record_prefix=record_prefix,
+                  img_size=img_size, fps=fps)
+    cropper_kwargs = dict(detect_every=detect_every, detect_scale=detect_scale, smoothing=smoothing)
+    t0 = time.perf_counter()
+    for res in tqdm(map_isolated(job, videos, workers=workers, initializer=_init_worker,
+                                 initargs=(cropper_kwargs, writer_kwargs)),
+                    total=len(videos), desc="Videos"):
+        if not res.ok:
+            failed.append(res)
+            print(f"❌ {res.item.name}: {res.error}")
+            continue
+        if res.value is None:
+            print(f"⚠️ No segments found for {res.item.name}")
+            continue
+        done += 1
+        total.frames_decoded += res.value.frames_decoded
+        total.frames_written += res.value.frames_written
+        total.no_face += res.value.no_face
+        total.clips += res.value.clips
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+
+    print(f"[INFO] {done}/{len(videos)} videos in {elapsed:.1f}s with {workers} worker(s) | "
+          f"{done / elapsed:.2f} videos/s, {total.frames_decoded / elapsed:.1f} frames/s decoded")
+    print(f"[INFO] clips={total.clips} crops written={total.frames_written} no-face frames={total.no_face}")
+    if failed:
+        print(f"⚠️ {len(failed)} video(s) failed: {', '.join(r.item.name for r in failed)}")
+    return total
+
+
+# Example Usage
+# preprocess_all(
+#     raw_videos=Path("data/raw/speaker01"),
+#     mlf_path=Path("alignments/all.mlf"),
+#     cropped_dir=Path("data/cropped_frames"),
+#     img_size=(64, 64),
+#     workers=8,
+# )
@@ -0,0 +1,229 @@
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+
+from ..phonemes import VISEME_CLASSES
+from .registry import CONDITIONAL_DIR, conditional_export, find_generator
+
+BANK_DATA = "frames.npy"
+BANK_INDEX = "index.json"
+# File in bank_dir naming the version subdirectory (BANK_DATA + BANK_INDEX) being served
+BANK_CURRENT = "CURRENT"
+# Lock file in bank_dir held while a process checks and rebuilds the bank
+BANK_LOCK = "build.lock"
+
+
+def _sources(cfg) -> Dict[str, Path]:
+    """Viseme class -> generator export that serves it: the class-conditional GAN's for
+    every class it was trained on when inference uses it (see conditional_export),
+    else each class's own latest (or cfg.inference.epoch) export.
+    """
+    path, classes = conditional_export(cfg)
+    if path is not None:
+        return {v: path for v in classes}
+    exports = {v: find_generator(Path(cfg.paths.models_root) / v, cfg.inference.epoch) for v in VISEME_CLASSES}
+    return {v: p for v, p in exports.items() if p is not None}
+
+
+def build_bank(cfg, bank_dir: Optional[Path] = None, clips: Optional[int] = None,
+               seed: int = 0) -> Path:
+    """
+    Sample `clips` clips (default cfg.inference.bank_clips) per viseme class from the
+    generator inference would use for it (the class-conditional GAN if exported and
+    INFERENCE.conditional, else the class's own; export cfg.inference.epoch, latest if
+    None) and store them in bank_dir (default cfg.inference.bank_dir) as one uint8
+    .npy array (N, T, H, W, 3), memory-mapped when served, plus an index of which rows
+    belong to which class and the generator export they came from. Classes without a
+    generator are left out.
+
+    Needs TensorFlow. Each build is written to a new version subdirectory and then
+    published by replacing the BANK_CURRENT pointer, so readers always see a matching
+    array and index and a server reading the old bank is not disturbed; versions
+    older than the replaced one are removed. Builds of several processes are
+    serialized through a lock file in bank_dir. Returns the bank directory.
+    """
+    bank_dir = Path(bank_dir or cfg.inference.bank_dir)
+    with _locked(bank_dir):
+        return _build(cfg, bank_dir, clips, seed)
+
+
+@contextmanager
+def _locked(bank_dir: Path):
+    """Hold the BANK_LOCK file of bank_dir exclusively (across processes)."""
+    bank_dir.mkdir(parents=True, exist_ok=True)
+    with open(bank_dir / BANK_LOCK, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 s; a rebuild can take longer
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _build(cfg, bank_dir: Path, clips: Optional[int], seed: int) -> Path:
+    """build_bank with the bank lock held."""
+    from ..utils.image import to_uint8
+    from .merge_gans import generate_clips, load_conditional_generator
+    from .registry import get_registry
+
+    clips = clips or cfg.inference.bank_clips
+    registry = get_registry(cfg)
+    rng = np.random.default_rng(seed)
+
+    root = Path(cfg.paths.models_root)
+    data, entries, start = [], {}, 0
+    for viseme, path in _sources(cfg).items():
+        if path.parent.name == CONDITIONAL_DIR:
+            generator, classes = load_conditional_generator(path.parent, cfg.inference.epoch)
+            ids = np.full(clips, classes.index(viseme))
+        else:
+            generator, ids = registry.get(path.parent, cfg.inference.epoch), None
+        data.append(to_uint8(generate_clips(generator, clips, cfg.train.z_dim, rng=rng, viseme_ids=ids)))
+        entries[viseme] = dict(start=start, count=clips, generator=path.relative_to(root).as_posix(),
+                               mtime_ns=path.stat().st_mtime_ns)
+        start += clips
+        print(f"[INFO] Frame bank: {viseme} <- {entries[viseme]['generator']} ({clips} clips)")
+    if not data:
+        raise ValueError(f"No trained generators under {cfg.paths.models_root}")
+    shapes = {d.shape[1:] for d in data}
+    if len(shapes) > 1:
+        raise ValueError(f"Generators disagree on clip shape: {sorted(shapes)}")
+
+    version = f"v{time.time_ns()}"
+    (bank_dir / version).mkdir()
+    mm = np.lib.format.open_memmap(bank_dir / version / BANK_DATA, mode="w+", dtype=np.uint8,
+                                   shape=(start,) + data[0].shape[1:])
+    mm[:] = np.concatenate(data)
+    mm.flush()
+    del mm
+    index = dict(shape=[start] + list(data[0].shape[1:]), epoch=cfg.inference.epoch, seed=seed, classes=entries)
+    (bank_dir / version / BANK_INDEX).write_text(json.dumps(index, indent=2), encoding="utf-8")
+    _publish(bank_dir, version)
+    return bank_dir
+
+
+def _current(bank_dir: Path) -> Optional[str]:
+    """Version subdirectory the BANK_CURRENT pointer of bank_dir names, None if unset."""
+    pointer = bank_dir / BANK_CURRENT
+    return pointer.read_text(encoding="utf-8").strip() if pointer.exists() else None
+
+
+def _publish(bank_dir: Path, version: str):
+    """Point bank_dir at `version` in one os.replace, then remove the versions older
+    than the one it replaces (servers may still be reading that one).
+    """
+    previous = _current(bank_dir)
+    tmp = bank_dir / f"{BANK_CURRENT}.{version}.tmp"
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, bank_dir / BANK_CURRENT)
+    for old in bank_dir.glob("v*"):
+        if old.is_dir() and old.name not in (version, previous):
+            shutil.rmtree(old, ignore_errors=True)  # still memory-mapped on Windows: left for next time
+    for legacy in (BANK_DATA, BANK_INDEX):  # unversioned bank of earlier releases
+        (bank_dir / legacy).unlink(missing_ok=True)
+
+
+class FrameBank:
+    """
+    Read-only view of a frame bank written by build_bank. Serving only indexes the
+    memory-mapped clips (no TensorFlow); rows are picked with a caller-supplied
+    numpy Generator, so a seed reproduces an animation.
+
+        bank = FrameBank(cfg.inference.bank_dir)
+        frames = bank.render(plan_word("cat", 25), np.random.default_rng(0))
+    """
+
+    def __init__(self, bank_dir: Path):
+        self.bank_dir = Path(bank_dir)
+        self.version = _current(self.bank_dir)
+        if self.version is None:
+            raise FileNotFoundError(f"No frame bank in {self.bank_dir} (missing {BANK_CURRENT})")
+        self.path = self.bank_dir / self.version
+        self.index = json.loads((self.path / BANK_INDEX).read_text(encoding="utf-8"))
+        self.clips = np.load(self.path / BANK_DATA, mmap_mode="r")
+
+    @property
+    def classes(self) -> List[str]:
+        return list(self.index["classes"])
+
+    def __contains__(self, viseme: str) -> bool:
+        return viseme in self.index["classes"]
+
+    def is_stale(self, cfg) -> bool:
+        """True if the generator export serving a class differs from the one the bank
+        was sampled from (a newer generator_epoch_*.model.keras, a re-export, a newly
+        trained class, or a switch between conditional and per-class GANs).
+        """
+        root = Path(cfg.paths.models_root)
+        current = {v: (p.relative_to(root).as_posix(), p.stat().st_mtime_ns) for v, p in _sources(cfg).items()}
+        return current != {v: (e["generator"], e["mtime_ns"]) for v, e in self.index["classes"].items()}
+
+    def render(self, schedule, rng: np.random.Generator) -> List[np.ndarray]:
+        """uint8 frames for a plan_word schedule: a segment of n frames plays ceil(n / T)
+        randomly chosen clips of its class, cut to n, as merge_gans.render_schedule
+        does with fresh samples. Segments of classes not in the bank are skipped.
+        """
+        T = self.clips.shape[1]
+        frames = []
+        for _, viseme, n in schedule:
+            entry = self.index["classes"].get(viseme)
+            if entry is None:
+                continue
+            rows = entry["start"] + rng.integers(entry["count"], size=-(-n // T))
+            frames += list(self.clips[rows].reshape((-1,) + self.clips.shape[2:])[:n])
+        return frames
+
+
+_bank: Optional[FrameBank] = None
+_bank_lock = threading.Lock()
+
+
+def open_bank(cfg) -> Optional[FrameBank]:
+    """The frame bank at cfg.inference.bank_dir (None if unset), built on first use and
+    rebuilt when a class has a newer generator export than the bank.
+
+    When the bank this process holds is out of date, the current one is reopened from
+    disk under the bank's lock file and only rebuilt if that is out of date too, so
+    of several server processes only the first rebuilds and the others pick up its
+    bank.
+    """
+    global _bank
+    if cfg.inference.bank_dir is None:
+        return None
+    bank_dir = Path(cfg.inference.bank_dir)
+    with _bank_lock:
+        if _bank is not None and _bank.bank_dir == bank_dir and not _bank.is_stale(cfg):
+            return _bank
+        with _locked(bank_dir):
+            _bank = FrameBank(bank_dir) if _current(bank_dir) else None
+            if _bank is None or _bank.is_stale(cfg):
+                print(f"[INFO] Frame bank {bank_dir} missing or out of date, rebuilding...")
+                _bank = FrameBank(_build(cfg, bank_dir, None, 0))
+        return _bank
+
+
+# Example Usage
+# build_bank(cfg, clips=64)            # offline: python scripts/build_frame_bank.py --paths ...
+# bank = open_bank(cfg)
+# frames = bank.render([("k", "03_Open_Mouth", 3), ("ae", "03_Open_Mouth", 5)], np.random.default_rng(7))
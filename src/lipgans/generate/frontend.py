@@ -1,18 +1,53 @@
+import os
+import time
+from functools import lru_cache
 import gradio as gr
 from pathlib import Path
 from ..config import Config
+from ..phonemes import VISEME_CLASSES
 from .merge_gans import generate_word
+from .registry import CONDITIONAL_DIR, conditional_export, get_registry
+from .stream import generate_text
+
+@lru_cache(maxsize=8)
+def _load_config(cfg_path: str, mtime: float) -> Config:
+    return Config.load(cfg_path)
+
+def _config(cfg_path: str) -> Config:
+    """Config for cfg_path, parsed again only when the file changes."""
+    return _load_config(cfg_path, os.path.getmtime(cfg_path))
 
 def build_app(default_cfg_path: str):
+    cfg = _config(default_cfg_path)
+    if cfg.inference.prewarm:
+        classes = [CONDITIONAL_DIR] if conditional_export(cfg)[0] is not None else VISEME_CLASSES
+        n = get_registry(cfg).prewarm(cfg.paths.models_root, classes, cfg.inference.epoch)
+        print(f"[INFO] Pre-warmed {n} generators: {get_registry().stats()}")
 
     def _go(word: str, cfg_path: str):
         try:
-            cfg = Config.load(cfg_path)  # load config dynamically
+            cfg = _config(cfg_path)
             gif, mp4 = generate_word(word, cfg)
+            print(f"[INFO] Generator registry: {get_registry().stats()}")
             return str(gif), str(mp4)
         except Exception as e:
             return f"Error: {e}", None
 
+    def _stream(text: str, cfg_path: str):
+        """Play the sentence frame by frame at cfg fps while later words are still generated."""
+        try:
+            cfg = _config(cfg_path)
+            period, due = 1.0 / cfg.paths.fps, 0.0
+            for chunk in generate_text(text, cfg):
+                for frame in chunk:
+                    now = time.perf_counter()
+                    due = max(due, now)  # fell behind generation: play on from now
+                    time.sleep(due - now)
+                    due += period
+                    yield frame
+        except Exception as e:
+            raise gr.Error(str(e))
+
     with gr.Blocks() as demo:
         gr.Markdown("# LipGANs — type a word, get a lip GIF/MP4")
         with gr.Row():
@@ -24,6 +59,12 @@ def build_app(default_cfg_path: str):
         
         btn.click(_go, inputs=[word_input, cfg_input], outputs=[gif_out, mp4_out])
 
+        gr.Markdown("## Sentence (streamed)")
+        text_input = gr.Textbox(label="Text", value="Hello, world.")
+        stream_btn = gr.Button("Stream")
+        live_out = gr.Image(label="Live", type="numpy")
+        stream_btn.click(_stream, inputs=[text_input, cfg_input], outputs=live_out)
+
     return demo
 
 if __name__ == "__main__":
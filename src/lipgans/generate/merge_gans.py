@@ -1,11 +1,16 @@
+import json
 import os
+from pathlib import Path
 import numpy as np
-import tensorflow as tf
 from PIL import Image
-import cv2
 import nltk
 from nltk.corpus import cmudict
 
+from ..utils.image import to_uint8
+from ..utils.video import encode_gif, encode_mp4
+from .bank import open_bank
+from .registry import CONDITIONAL_DIR, get_registry
+
 # Download CMUdict if needed
 nltk.download('cmudict')
 cmu_dict = cmudict.dict()
@@ -39,50 +44,190 @@ def get_phonemes(word):
     return [p.lower().strip("0123456789") for p in phonemes]
 
 def load_gan_model(viseme_class_path, epoch=100):
-    """Load generator model if exists, else return None."""
-    model_path = os.path.join(viseme_class_path, f"generator_epoch_{epoch}.model.keras")
-    if not os.path.exists(model_path):
-        return None
-    return tf.keras.models.load_model(model_path)
+    """Generator model if exported (epoch None = latest export), else None. Served from
+    the process-wide GeneratorRegistry, so each file is deserialised once.
+    """
+    return get_registry().get(viseme_class_path, epoch)
+
+def _forward(generator, latent_dim):
+    """generator(z, training=False) (or generator([z, viseme_ids]) for the
+    class-conditional GAN) as a tf.function traced once for any batch size (cached on
+    the model, so it is dropped with it when the registry evicts it).
+    """
+    fn = getattr(generator, "_lipgans_forward", None)
+    if fn is None:
+        import tensorflow as tf  # lazily: frame-bank serving never runs a generator
+        z_spec = tf.TensorSpec((None, latent_dim), tf.float32)
+        if _is_conditional(generator):
+            fn = tf.function(lambda z, ids: generator([z, ids], training=False),
+                             input_signature=[z_spec, tf.TensorSpec((None, 1), tf.int32)])
+        else:
+            fn = tf.function(lambda z: generator(z, training=False), input_signature=[z_spec])
+        generator._lipgans_forward = fn
+    return fn
+
+def _is_conditional(generator):
+    return len(generator.inputs) > 1
+
+def _clip_frames(generator):
+    """Frames T per generated sample."""
+    return generator.output_shape[1] if len(generator.output_shape) == 5 else 1
+
+def generate_clips(generator, n, latent_dim=100, rng=None, viseme_ids=None):
+    """n samples from a GAN in one batched forward pass: (n, T, H, W, 3) float clips
+    in [-1, 1] (T = 1 for image generators). z is drawn from `rng` (a numpy Generator)
+    if given, else from np.random. A class-conditional generator needs `viseme_ids`,
+    the class id of each sample.
+    """
+    z = (np.random if rng is None else rng).normal(0, 1, (n, latent_dim)).astype(np.float32)
+    if _is_conditional(generator):
+        ids = np.asarray(viseme_ids, dtype=np.int32).reshape(n, 1)
+        gen = _forward(generator, latent_dim)(z, ids).numpy()
+    else:
+        gen = _forward(generator, latent_dim)(z).numpy()
+    return gen if gen.ndim == 5 else gen[:, None]
 
 def generate_lip_frame(generator, latent_dim=100):
     """Generate one lip frame from a GAN."""
-    z = np.random.normal(0, 1, (1, latent_dim))
-    gen = generator.predict(z)
-    if gen.ndim == 5:
-        return gen[0, 0]
-    elif gen.ndim == 4:
-        return gen[0]
-    else:
-        return gen
+    return generate_clips(generator, 1, latent_dim)[0, 0]
+
+def load_conditional_generator(conditional_path, epoch=None):
+    """Load the class-conditional generator (epoch None = latest export) and its class
+    list (viseme id -> class name). Returns (generator, classes), or (None, []) if not
+    trained.
+    """
+    classes_path = os.path.join(conditional_path, "classes.json")
+    generator = get_registry().get(conditional_path, epoch)
+    if generator is None or not os.path.exists(classes_path):
+        return None, []
+    with open(classes_path, encoding="utf-8") as f:
+        classes = json.load(f)
+    return generator, classes
 
 def save_frame(image_array, save_path):
-    """Save a numpy image array as PNG."""
-    image_array = np.clip(image_array, 0, 1)
-    image_array = (image_array * 255).astype(np.uint8)
-    Image.fromarray(image_array).save(save_path)
+    """Save a generator frame ([-1, 1] float, or uint8) as PNG."""
+    Image.fromarray(to_uint8(image_array)).save(save_path)
 
 def predict_durations(phonemes, base_duration=0.1):
     """Assign simple durations: longer for vowels."""
     vowels = ['aa','ae','ah','eh','ih','iy','er','ey','uh','uw','aw','ow','oy','ay']
     return [base_duration*1.5 if p in vowels else base_duration for p in phonemes]
 
+def plan_word(word, fps):
+    """Frame schedule of `word`: [(phoneme, viseme class, n_frames)], each phoneme held
+    for its predicted duration at `fps`. Phonemes without a viseme class are skipped
+    with a warning.
+    """
+    phonemes = get_phonemes(word)
+    schedule = []
+    for phoneme, duration in zip(phonemes, predict_durations(phonemes)):
+        viseme = phoneme_to_mouth_shape.get(phoneme)
+        if viseme is None:
+            print(f"⚠️ No viseme class for phoneme '{phoneme}', skipping")
+            continue
+        schedule.append((phoneme, viseme, max(1, round(duration * fps))))
+    return schedule
+
+def render_schedule(schedule, generators, latent_dim=100, rng=None, viseme_ids=None):
+    """Frames for a schedule from plan_word, with one batched call per generator. A
+    segment of n frames plays the T frames of ceil(n / T) generated clips in order,
+    cut to n. `generators` maps viseme class -> generator; segments of classes missing
+    from it are skipped. A class-conditional generator may serve several classes and
+    is called once for all of them, with ids from `viseme_ids` (class -> id).
+    """
+    calls = {}  # id(generator) -> (generator, [(segment index, viseme, clips)])
+    for i, (_, viseme, n) in enumerate(schedule):
+        generator = generators.get(viseme)
+        if generator is not None:
+            calls.setdefault(id(generator), (generator, []))[1].append((i, viseme, -(-n // _clip_frames(generator))))
+    segments = {}
+    for generator, items in calls.values():
+        counts = [m for _, _, m in items]
+        ids = np.repeat([viseme_ids[v] for _, v, _ in items], counts) if viseme_ids is not None else None
+        clips = generate_clips(generator, sum(counts), latent_dim, rng=rng, viseme_ids=ids)
+        for (i, _, _), clip in zip(items, np.split(clips, np.cumsum(counts)[:-1])):
+            segments[i] = clip
+
+    frames = []
+    for i, (_, _, n) in enumerate(schedule):
+        if i in segments:
+            frames += list(segments[i].reshape((-1,) + segments[i].shape[2:])[:n])
+    return frames
+
+def render_frames(schedule, cfg, rng=None, warned=None):
+    """uint8 frames for a plan_word schedule: looked up in the precomputed frame bank
+    when cfg.inference.bank_dir is set (no generator call, see generate.bank), else
+    sampled from the class-conditional GAN under models_root/conditional (if exported
+    and INFERENCE.conditional; one call for all classes) or from the per-class
+    generators under cfg.paths.models_root. Segments whose class has no trained
+    generator are skipped, warning once per class (`warned` collects the classes
+    already reported).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    warned = set() if warned is None else warned
+    visemes = dict.fromkeys(v for _, v, _ in schedule)
+    bank = open_bank(cfg)
+    ids = None
+    if bank is None:
+        registry = get_registry(cfg)
+        root = Path(cfg.paths.models_root)
+        conditional, classes = (load_conditional_generator(root / CONDITIONAL_DIR, cfg.inference.epoch)
+                                if cfg.inference.conditional else (None, []))
+        if conditional is not None:
+            generators = {v: conditional for v in visemes if v in classes}
+            ids = {v: classes.index(v) for v in generators}
+        else:
+            generators = {v: registry.get(root / v, cfg.inference.epoch) for v in visemes}
+            generators = {v: g for v, g in generators.items() if g is not None}
+    for viseme in visemes:
+        if viseme not in (bank if bank is not None else generators) and viseme not in warned:
+            warned.add(viseme)
+            print(f"⚠️ No trained generator for {viseme}, skipping its phonemes")
+    if bank is not None:
+        return bank.render(schedule, rng)
+    return [to_uint8(f) for f in render_schedule(schedule, generators, cfg.train.z_dim, rng=rng, viseme_ids=ids)]
+
+def render_word(word, cfg, seed=None):
+    """Lip animation frames of `word` as a uint8 (N, H, W, 3) array at cfg.paths.fps
+    (see plan_word / render_frames); `seed` makes the sampled clips reproducible.
+    """
+    frames = render_frames(plan_word(word, cfg.paths.fps), cfg, np.random.default_rng(seed))
+    if not frames:
+        raise ValueError(f"No frames generated for '{word}' (no trained generators for its visemes?)")
+    return np.stack(frames)
+
+def generate_word(word, cfg, out_dir=None, save_frames=False, seed=None):
+    """Lip animation for `word` (see render_word), encoded in memory and written as
+    <word>.gif and <word>.mp4 to out_dir (default merge_dir/<word>); the frames are
+    also saved as <word>_NN.png only if `save_frames`. Returns (gif_path, mp4_path).
+    """
+    name = word.lower()
+    out_dir = Path(out_dir) if out_dir else Path(cfg.paths.merge_dir) / name
+    clip = render_word(word, cfg, seed=seed)
+
+    if save_frames:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for old in out_dir.glob(f"{name}_*.png"):  # frames of a previous run
+            old.unlink()
+        for i, frame in enumerate(clip, 1):
+            save_frame(frame, out_dir / f"{name}_{i:02d}.png")
+    gif_path, mp4_path = out_dir / f"{name}.gif", out_dir / f"{name}.mp4"
+    encode_gif(clip, fps=cfg.paths.fps, path=gif_path)
+    encode_mp4(clip, fps=cfg.paths.fps, path=mp4_path)
+    return gif_path, mp4_path
+
+def _folder_frames(folder):
+    files = sorted(f for f in os.listdir(folder) if f.endswith(".png"))
+    return [np.asarray(Image.open(os.path.join(folder, f)).convert("RGB")) for f in files]
+
 def create_gif(folder, output_path, duration=100):
-    """Create a GIF from saved PNG frames."""
-    from PIL import Image
-    files = sorted([f for f in os.listdir(folder) if f.endswith(".png")])
-    frames = [Image.open(os.path.join(folder, f)) for f in files]
+    """Create a GIF from saved PNG frames (for arrays in memory use utils.video.encode_gif)."""
+    frames = _folder_frames(folder)
     if frames:
-        frames[0].save(output_path, save_all=True, append_images=frames[1:], duration=duration, loop=0)
+        encode_gif(frames, fps=1000 / duration, path=output_path)
 
 def create_mp4(folder, output_path, fps=25):
-    """Create an MP4 video from saved PNG frames."""
-    files = sorted([f for f in os.listdir(folder) if f.endswith(".png")])
-    if not files: return
-    first_frame = cv2.imread(os.path.join(folder, files[0]))
-    h, w, _ = first_frame.shape
-    video = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
-    for f in files:
-        frame = cv2.imread(os.path.join(folder, f))
-        video.write(frame)
-    video.release()
+    """Create an MP4 video from saved PNG frames (for arrays in memory use utils.video.encode_mp4)."""
+    frames = _folder_frames(folder)
+    if frames:
+        encode_mp4(frames, fps=fps, path=output_path)
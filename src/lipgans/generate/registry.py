@@ -0,0 +1,139 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+
+CONDITIONAL_DIR = "conditional"  # models_root subdirectory of the class-conditional GAN
+
+_EXPORT = re.compile(r"generator_epoch_(\d+)\.model\.keras$")
+
+
+def find_generator(class_dir: Path, epoch: Optional[int] = None) -> Optional[Path]:
+    """Path of generator_epoch_{epoch}.model.keras in class_dir (the highest epoch if
+    `epoch` is None), or None if there is no such export.
+    """
+    class_dir = Path(class_dir)
+    if epoch is not None:
+        path = class_dir / f"generator_epoch_{epoch}.model.keras"
+        return path if path.exists() else None
+    if not class_dir.is_dir():
+        return None
+    found = [(int(m.group(1)), p) for p in class_dir.iterdir() if (m := _EXPORT.match(p.name))]
+    return max(found)[1] if found else None
+
+
+def conditional_export(cfg) -> Tuple[Optional[Path], List[str]]:
+    """(export, classes) of the class-conditional GAN under cfg.paths.models_root when
+    inference should use it (INFERENCE.conditional, exported with its classes.json;
+    export cfg.inference.epoch, latest if None), else (None, []). `classes` maps
+    viseme id -> class name.
+    """
+    if not cfg.inference.conditional:
+        return None, []
+    cond_dir = Path(cfg.paths.models_root) / CONDITIONAL_DIR
+    path = find_generator(cond_dir, cfg.inference.epoch)
+    if path is None or not (cond_dir / "classes.json").exists():
+        return None, []
+    return path, json.loads((cond_dir / "classes.json").read_text(encoding="utf-8"))
+
+
+def _model_bytes(model) -> int:
+    return int(sum(np.prod(v.shape) * np.dtype(v.dtype).itemsize for v in model.weights))
+
+
+class GeneratorRegistry:
+    """
+    Process-wide cache of loaded generators for inference.
+
+    Entries are keyed by (class directory, epoch, file mtime), so a re-exported model
+    is reloaded and its stale entry dropped. Least recently used generators are
+    evicted beyond `max_models` resident models or `max_bytes` of weights (0 = no
+    limit). Thread-safe; `stats()` returns hit / miss / load-time counters.
+    """
+
+    def __init__(self, max_models: int = 0, max_bytes: int = 0):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (model, bytes)
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.loads = self.evictions = 0
+        self.load_s = 0.0
+
+    def get(self, class_dir: Path, epoch: Optional[int] = None):
+        """Generator exported to class_dir at `epoch` (latest if None); None if not trained."""
+        path = find_generator(class_dir, epoch)
+        if path is None:
+            return None
+        key = (str(Path(class_dir).resolve()), path.name, path.stat().st_mtime_ns)
+        with self._lock:
+            if key in self._models:
+                self.hits += 1
+                self._models.move_to_end(key)
+                return self._models[key][0]
+            self.misses += 1
+            for old in [k for k in self._models if k[:2] == key[:2]]:  # older file at the same path
+                del self._models[old]
+            import tensorflow as tf  # lazily: find_generator is used by TF-free frame-bank serving
+            t0 = time.perf_counter()
+            model = tf.keras.models.load_model(path.as_posix(), compile=False)
+            self.load_s += time.perf_counter() - t0
+            self.loads += 1
+            self._models[key] = (model, _model_bytes(model))
+            self._evict()
+            return model
+
+    def prewarm(self, models_root: Path, classes: Iterable[str], epoch: Optional[int] = None) -> int:
+        """Load the generators of `classes` under models_root; returns how many exist."""
+        return sum(self.get(Path(models_root) / c, epoch) is not None for c in classes)
+
+    def set_budget(self, max_models: int = 0, max_bytes: int = 0):
+        with self._lock:
+            self.max_models, self.max_bytes = max_models, max_bytes
+            self._evict()
+
+    def _evict(self):
+        while len(self._models) > 1 and (
+                (self.max_models and len(self._models) > self.max_models)
+                or (self.max_bytes and self.resident_bytes > self.max_bytes)):
+            self._models.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(b for _, b in self._models.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, loads=self.loads, evictions=self.evictions,
+                        load_s=round(self.load_s, 3), resident=len(self._models),
+                        resident_mb=round(self.resident_bytes / 2 ** 20, 1))
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+_registry: Optional[GeneratorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(cfg=None) -> GeneratorRegistry:
+    """The process-wide registry; with a Config, its budget follows cfg.inference."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = GeneratorRegistry()
+    if cfg is not None:
+        _registry.set_budget(cfg.inference.max_models, int(cfg.inference.max_mb * 2 ** 20))
+    return _registry
+
+
+# Example Usage
+# reg = get_registry(cfg)
+# reg.prewarm(cfg.paths.models_root, VISEME_CLASSES)
+# gen = reg.get(cfg.paths.models_root / "03_Open_Mouth")   # latest export, loaded once
+# print(reg.stats())  # {'hits': 0, 'misses': 12, 'loads': 12, ...}
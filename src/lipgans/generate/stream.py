@@ -0,0 +1,86 @@
+import re
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+from .merge_gans import plan_word, render_frames
+
+PAUSE = "<pause>"
+_TOKEN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*|[.,!?;:]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words of `text`; sentence punctuation becomes a PAUSE token."""
+    return [PAUSE if t in ".,!?;:" else t.lower() for t in _TOKEN.findall(text)]
+
+
+def text_timeline(text: str, fps: int, pause_s: float = 0.2) -> List[Tuple[str, list]]:
+    """
+    Viseme/duration timeline of a sentence: [(word, schedule)] in order, where schedule
+    is merge_gans.plan_word(word, fps), so words map to the same viseme classes as in
+    generate_word, and a pause between words is (PAUSE, [(None, None, n_frames)]).
+    Words missing from CMUdict are skipped with a warning.
+    """
+    timeline = []
+    for token in tokenize(text):
+        if token == PAUSE:
+            n = round(pause_s * fps)
+            if n > 0 and timeline and timeline[-1][0] != PAUSE:
+                timeline.append((PAUSE, [(None, None, n)]))
+            continue
+        try:
+            schedule = plan_word(token, fps)
+        except ValueError as e:
+            print(f"⚠️ {e}, skipping")
+            continue
+        if schedule:
+            timeline.append((token, schedule))
+    if timeline and timeline[-1][0] == PAUSE:
+        timeline.pop()
+    return timeline
+
+
+def generate_text(text: str, cfg, chunk_frames: Optional[int] = None,
+                  seed: Optional[int] = None) -> Iterator[np.ndarray]:
+    """
+    Stream the lip animation of a sentence as uint8 frame chunks (n, H, W, 3) at
+    cfg.paths.fps.
+
+    Words are rendered one at a time (one batched generator call per viseme class, or
+    frame-bank lookups, see merge_gans.render_frames) and yielded as soon as they are
+    ready, so playback can start after the first word. Chunks hold `chunk_frames`
+    frames (default cfg.inference.chunk_frames; 0 = one chunk per word), the last one
+    may be shorter. Pauses at punctuation hold the previous frame. Visemes without a
+    trained generator are skipped with a warning; `seed` makes the output
+    reproducible.
+
+        for chunk in generate_text("hello world.", cfg):
+            player.push(chunk)
+    """
+    chunk_frames = cfg.inference.chunk_frames if chunk_frames is None else chunk_frames
+    rng, warned = np.random.default_rng(seed), set()
+    pending, last = [], None
+
+    for word, schedule in text_timeline(text, cfg.paths.fps, cfg.inference.pause_s):
+        if word == PAUSE:
+            frames = [last] * schedule[0][2] if last is not None else []
+        else:
+            frames = render_frames(schedule, cfg, rng, warned)
+        if not frames:
+            continue
+        last = frames[-1]
+        pending += frames
+        if chunk_frames <= 0:
+            yield np.stack(pending)
+            pending = []
+        while chunk_frames > 0 and len(pending) >= chunk_frames:
+            yield np.stack(pending[:chunk_frames])
+            pending = pending[chunk_frames:]
+    if pending:
+        yield np.stack(pending)
+
+
+# Example Usage
+# cfg = Config.load("config/paths.yaml")
+# text_timeline("Hello, world.", fps=25)
+# # [('hello', [('hh', '03_Open_Mouth', 4), ...]), ('<pause>', [(None, None, 5)]), ('world', [...])]
+# frames = np.concatenate(list(generate_text("Hello, world.", cfg)))
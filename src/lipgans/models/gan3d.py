@@ -1,17 +1,49 @@
 import tensorflow as tf
 from tensorflow.keras import layers
 
+from ..utils.image import to_model_range
+from ..utils.precision import scale_loss, unscale_gradients
+
+
 class VisemeGAN:
     """Simple 3D-GAN wrapper: generator + discriminator + train_step method.
        Generator output range: tanh [-1,1], shape (B, T, H, W, 3).
+
+       Layers follow the global Keras dtype policy (lipgans.utils.precision.set_policy);
+       the discriminator's sigmoid output is always float32. `jit_compile` compiles
+       train_step with XLA.
+
+       With a tf.distribute `strategy` (construct the GAN and its optimizers inside
+       strategy.scope()), train_step takes distributed batches, runs the step on every
+       replica and returns the global mean losses; gradients are all-reduced by the
+       optimizers. XLA is not used in that case.
     """
-    def __init__(self, z_dim: int = 100, target_frames: int = 3, img_size=(64,64)):
+    def __init__(self, z_dim: int = 100, target_frames: int = 3, img_size=(64,64), jit_compile: bool = False,
+                 strategy: tf.distribute.Strategy | None = None):
         self.z_dim = z_dim
         self.target_frames = target_frames
         self.img_size = img_size
+        self.strategy = strategy
+        self.jit_compile = jit_compile
         self.gen = self._build_generator()
         self.disc = self._build_discriminator()
-        self.bce = tf.keras.losses.BinaryCrossentropy(from_logits=False)
+        # Per-example losses, averaged over the global batch by compute_average_loss
+        self.bce = tf.keras.losses.BinaryCrossentropy(from_logits=False, reduction="none")
+        self._make_train_step()
+
+    def _make_train_step(self):
+        """(Re)create self.train_step, e.g. after self.gen / self.disc were replaced."""
+        if self.strategy is not None:
+            self.train_step = tf.function(self._distributed_train_step)
+        else:
+            self.train_step = tf.function(self._train_step, jit_compile=self.jit_compile)
+
+    @property
+    def state_models(self):
+        """(generator, discriminator) models holding every variable of the GAN; what
+        TrainingCheckpoint saves and the optimizers are built for.
+        """
+        return self.gen, self.disc
 
     def _build_generator(self):
         model = tf.keras.Sequential(name="Generator")
@@ -39,30 +71,281 @@ class VisemeGAN:
         model.add(layers.LeakyReLU(0.2)); model.add(layers.Dropout(0.3))
 
         model.add(layers.Flatten())
-        model.add(layers.Dense(1, activation='sigmoid'))
+        model.add(layers.Dense(1, activation='sigmoid', dtype='float32'))
         return model
 
-    @tf.function
-    def train_step(self, real_clips, g_opt, d_opt):
-        """Single training step. real_clips shape: (B, T, H, W, 3)"""
+    def _gen_inputs(self, noise, viseme_ids):
+        return noise
+
+    def _disc_inputs(self, clips, viseme_ids):
+        return clips
+
+    def sample(self, n: int = 1, viseme_ids=None, noise=None):
+        """Generate n clips in [-1, 1] (viseme_ids is ignored by the unconditional model).
+        `noise` (n, z_dim) fixes the latents; random by default.
+        """
+        if noise is None:
+            noise = tf.random.normal([n, self.z_dim])
+        return self.gen(self._gen_inputs(noise, viseme_ids), training=False)
+
+    def _distributed_train_step(self, real_clips, g_opt, d_opt, viseme_ids=None):
+        g_loss, d_loss = self.strategy.run(self._train_step, args=(real_clips, g_opt, d_opt, viseme_ids))
+        sum_ = tf.distribute.ReduceOp.SUM  # replica losses are already divided by the global batch
+        return self.strategy.reduce(sum_, g_loss, axis=None), self.strategy.reduce(sum_, d_loss, axis=None)
+
+    def _train_step(self, real_clips, g_opt, d_opt, viseme_ids=None):
+        """Single training step (wrapped as self.train_step). real_clips shape:
+        (B, T, H, W, 3), uint8 in [0, 255]. viseme_ids (B,) int32 is only used by
+        ConditionalVisemeGAN. Losses are scaled for LossScaleOptimizer wrappers.
+        """
+        real_clips = to_model_range(real_clips)
         batch_size = tf.shape(real_clips)[0]
         noise = tf.random.normal([batch_size, self.z_dim])
+        gen_in = self._gen_inputs(noise, viseme_ids)
 
-        # Discriminator step
-        with tf.GradientTape() as d_tape:
-            fake_clips = self.gen(noise, training=True)
-            real_out = self.disc(real_clips, training=True)
-            fake_out = self.disc(fake_clips, training=True)
-            d_loss = self.bce(tf.ones_like(real_out), real_out) + self.bce(tf.zeros_like(fake_out), fake_out)
-        d_grads = d_tape.gradient(d_loss, self.disc.trainable_variables)
-        d_opt.apply_gradients(zip(d_grads, self.disc.trainable_variables))
-
-        # Generator step
         with tf.GradientTape() as g_tape:
-            fake_clips = self.gen(noise, training=True)
-            fake_out = self.disc(fake_clips, training=True)
-            g_loss = self.bce(tf.ones_like(fake_out), fake_out)
-        g_grads = g_tape.gradient(g_loss, self.gen.trainable_variables)
+            # One generator forward pass per step, shared by both updates
+            fake_clips = self.gen(gen_in, training=True)
+
+            # Discriminator step (not recorded on the generator tape)
+            with g_tape.stop_recording():
+                with tf.GradientTape() as d_tape:
+                    real_out = self.disc(self._disc_inputs(real_clips, viseme_ids), training=True)
+                    fake_out = self.disc(self._disc_inputs(fake_clips, viseme_ids), training=True)
+                    d_loss = tf.nn.compute_average_loss(self.bce(tf.ones_like(real_out), real_out)
+                                                        + self.bce(tf.zeros_like(fake_out), fake_out))
+                    d_scaled = scale_loss(d_opt, d_loss)
+                d_grads = unscale_gradients(d_opt, d_tape.gradient(d_scaled, self.disc.trainable_variables))
+                d_opt.apply_gradients(zip(d_grads, self.disc.trainable_variables))
+
+            # Generator step, scored by the updated discriminator as before
+            fake_out = self.disc(self._disc_inputs(fake_clips, viseme_ids), training=True)
+            g_loss = tf.nn.compute_average_loss(self.bce(tf.ones_like(fake_out), fake_out))
+            g_scaled = scale_loss(g_opt, g_loss)
+        g_grads = unscale_gradients(g_opt, g_tape.gradient(g_scaled, self.gen.trainable_variables))
         g_opt.apply_gradients(zip(g_grads, self.gen.trainable_variables))
 
         return g_loss, d_loss
+
+
+class ConditionalVisemeGAN(VisemeGAN):
+    """One class-conditional 3D-GAN for all viseme classes.
+
+    The generator takes [z, viseme_id] (viseme id embedded and concatenated to z);
+    the discriminator takes [clip, viseme_id] (id embedded as an extra input channel).
+    A batch may mix viseme ids freely.
+    """
+    def __init__(self, num_classes: int, z_dim: int = 100, target_frames: int = 3, img_size=(64,64),
+                 embed_dim: int = 32, jit_compile: bool = False, strategy: tf.distribute.Strategy | None = None):
+        self.num_classes = num_classes
+        self.embed_dim = embed_dim
+        super().__init__(z_dim=z_dim, target_frames=target_frames, img_size=img_size, jit_compile=jit_compile,
+                         strategy=strategy)
+
+    def _build_generator(self):
+        z = layers.Input(shape=(self.z_dim,), name="z")
+        vid = layers.Input(shape=(1,), dtype="int32", name="viseme_id")
+        emb = layers.Flatten()(layers.Embedding(self.num_classes, self.embed_dim)(vid))
+        x = layers.Concatenate()([z, emb])
+
+        x = layers.Dense(self.target_frames * 8 * 8 * 256)(x)
+        x = layers.Reshape((self.target_frames, 8, 8, 256))(x)
+        for filters in (128, 64):
+            x = layers.Conv3DTranspose(filters, (1,4,4), strides=(1,2,2), padding='same')(x)
+            x = layers.BatchNormalization()(x)
+            x = layers.ReLU()(x)
+        out = layers.Conv3DTranspose(3, (1,4,4), strides=(1,2,2), padding='same', activation='tanh')(x)
+        return tf.keras.Model([z, vid], out, name="ConditionalGenerator")
+
+    def _build_discriminator(self):
+        T, H, W = self.target_frames, self.img_size[0], self.img_size[1]
+        clip = layers.Input(shape=(T, H, W, 3), name="clip")
+        vid = layers.Input(shape=(1,), dtype="int32", name="viseme_id")
+        label_map = layers.Reshape((T, H, W, 1))(layers.Embedding(self.num_classes, T * H * W)(vid))
+        x = layers.Concatenate(axis=-1)([clip, label_map])
+
+        for filters in (64, 128):
+            x = layers.Conv3D(filters, 4, strides=2, padding='same')(x)
+            x = layers.LeakyReLU(0.2)(x)
+            x = layers.Dropout(0.3)(x)
+        x = layers.Flatten()(x)
+        out = layers.Dense(1, activation='sigmoid', dtype='float32')(x)
+        return tf.keras.Model([clip, vid], out, name="ConditionalDiscriminator")
+
+    def _gen_inputs(self, noise, viseme_ids):
+        return [noise, tf.reshape(tf.cast(viseme_ids, tf.int32), [-1, 1])]
+
+    def _disc_inputs(self, clips, viseme_ids):
+        return [clips, tf.reshape(tf.cast(viseme_ids, tf.int32), [-1, 1])]
+
+    def sample(self, n: int = 1, viseme_ids=None, noise=None):
+        """Generate n clips in [-1, 1]; random classes unless viseme_ids (n,) is given."""
+        if viseme_ids is None:
+            viseme_ids = tf.random.uniform([n], 0, self.num_classes, dtype=tf.int32)
+        return super().sample(n, viseme_ids, noise)
+
+
+@tf.keras.utils.register_keras_serializable(package="lipgans")
+class FadeIn(layers.Layer):
+    """[old, new] -> old + alpha * (new - old); alpha is a non-trainable weight set by the trainer."""
+    def build(self, input_shape=None):
+        self.alpha = self.add_weight(name="alpha", shape=(), initializer="zeros", trainable=False)
+        self.built = True
+
+    def call(self, inputs):
+        old, new = inputs
+        return old + tf.cast(self.alpha, new.dtype) * (new - old)
+
+
+class ProgressiveVisemeGAN(VisemeGAN):
+    """VisemeGAN grown by resolution stages: start_size, 2 * start_size, ..., img_size.
+
+    Both networks are stacks of per-resolution blocks (the generator upsamples from an
+    8x8 base and ends in a 1x1x1 to-RGB conv per resolution; the discriminator starts
+    with a from-RGB conv per resolution, downsamples frames to 8x8 and judges all
+    frames together in its dense head). Channel counts grow as resolution falls, so
+    low-resolution stages are cheap. `set_stage` rebuilds
+    self.gen / self.disc for one stage from the shared blocks, so all lower-resolution
+    weights carry over; while `fading`, the new block is blended in with weight alpha
+    (`set_alpha`) against the upsampled / downsampled path of the previous stage.
+
+    train_step expects real clips at the current stage size; `sample` upsamples to
+    img_size. state_models are models over every block, so checkpoints and optimizer
+    state cover all stages.
+    """
+    def __init__(self, z_dim: int = 100, target_frames: int = 3, img_size=(64,64), start_size: int = 16,
+                 jit_compile: bool = False, strategy: tf.distribute.Strategy | None = None):
+        size = img_size[0]
+        if img_size[0] != img_size[1] or start_size < 8 or size % start_size or (size // start_size) & (size // start_size - 1):
+            raise ValueError(f"img_size {tuple(img_size)} must be square and start_size ({start_size}) "
+                             f"times a power of two, with start_size >= 8")
+        self.stage_sizes = [start_size << i for i in range((size // start_size).bit_length())]
+        super().__init__(z_dim=z_dim, target_frames=target_frames, img_size=img_size, jit_compile=jit_compile,
+                         strategy=strategy)
+        self.set_stage(0)
+
+    @staticmethod
+    def _g_channels(res: int) -> int:
+        return max(16, 256 * 8 // res)
+
+    def _d_channels(self, res: int) -> int:
+        return min(128, 16 * self.img_size[0] // res)
+
+    def _build_generator(self):
+        T = self.target_frames
+        self._g_base = tf.keras.Sequential([layers.Dense(T * 8 * 8 * 256), layers.Reshape((T, 8, 8, 256))],
+                                           name="g_base")
+        self._g_blocks, self._to_rgb, self._g_fade = {}, {}, {}
+        res = 16
+        while res <= self.img_size[0]:
+            self._g_blocks[res] = tf.keras.Sequential([
+                layers.Conv3DTranspose(self._g_channels(res), (1,4,4), strides=(1,2,2), padding='same'),
+                layers.BatchNormalization(), layers.ReLU()], name=f"g_block_{res}")
+            res *= 2
+        for res in self.stage_sizes:
+            self._to_rgb[res] = layers.Conv3D(3, 1, padding='same', activation='tanh', name=f"to_rgb_{res}")
+        for res in self.stage_sizes[1:]:
+            self._g_fade[res] = FadeIn(name=f"g_fade_{res}")
+            self._g_fade[res].build()
+
+        # Every block and to-RGB head, one output per stage
+        z = layers.Input(shape=(self.z_dim,))
+        x, outs = self._g_base(z), []
+        for res in [8] + list(self._g_blocks):
+            if res > 8:
+                x = self._g_blocks[res](x)
+            if res in self._to_rgb:
+                outs.append(self._to_rgb[res](x))
+        self._gen_all = tf.keras.Model(z, outs, name="ProgressiveGenerator")
+        return self._gen_all
+
+    def _build_discriminator(self):
+        T = self.target_frames
+        self._from_rgb, self._d_blocks, self._d_fade = {}, {}, {}
+        for res in self.stage_sizes:
+            self._from_rgb[res] = tf.keras.Sequential([
+                layers.Conv3D(self._d_channels(res), 1, padding='same'), layers.LeakyReLU(0.2)],
+                name=f"from_rgb_{res}")
+        res = self.img_size[0]
+        while res > 8:
+            self._d_blocks[res] = tf.keras.Sequential([
+                layers.Conv3D(self._d_channels(res // 2), (1,4,4), strides=(1,2,2), padding='same'),
+                layers.LeakyReLU(0.2), layers.Dropout(0.3)], name=f"d_block_{res}")
+            res //= 2
+        self._d_head = tf.keras.Sequential([layers.Flatten(), layers.Dense(1, activation='sigmoid', dtype='float32')],
+                                           name="d_head")
+        for res in self.stage_sizes[1:]:
+            self._d_fade[res] = FadeIn(name=f"d_fade_{res}")
+            self._d_fade[res].build()
+
+        # Every from-RGB head and block, one input / output per stage
+        inputs, outs = [], []
+        for res in self.stage_sizes:
+            x = layers.Input(shape=(T, res, res, 3))
+            inputs.append(x)
+            outs.append(self._disc_path(self._from_rgb[res](x), res))
+        self._disc_all = tf.keras.Model(inputs, outs, name="ProgressiveDiscriminator")
+        return self._disc_all
+
+    def _disc_path(self, h, res):
+        while res > 8:
+            h = self._d_blocks[res](h)
+            res //= 2
+        return self._d_head(h)
+
+    @property
+    def state_models(self):
+        return self._gen_all, self._disc_all
+
+    def set_stage(self, stage: int, fading: bool = False):
+        """Switch self.gen / self.disc to `stage` (index into stage_sizes); `fading`
+        blends the stage's new blocks in from alpha 0 (ignored for stage 0).
+        """
+        res = self.stage_sizes[stage]
+        fading = fading and stage > 0
+        self.stage, self.fading, self.size = stage, fading, res
+
+        z = layers.Input(shape=(self.z_dim,))
+        x, r = self._g_base(z), 8
+        while r < res:
+            r *= 2
+            if fading and r == res:
+                old = layers.UpSampling3D((1, 2, 2))(self._to_rgb[res // 2](x))
+            x = self._g_blocks[r](x)
+        out = self._to_rgb[res](x)
+        if fading:
+            out = self._g_fade[res]([old, out])
+        self.gen = tf.keras.Model(z, out, name=f"Generator_{res}")
+
+        clip = layers.Input(shape=(self.target_frames, res, res, 3))
+        h = self._from_rgb[res](clip)
+        if fading:
+            old = self._from_rgb[res // 2](layers.AveragePooling3D((1, 2, 2))(clip))
+            h = self._d_fade[res]([old, self._d_blocks[res](h)])
+            out = self._disc_path(h, res // 2)
+        else:
+            out = self._disc_path(h, res)
+        self.disc = tf.keras.Model(clip, out, name=f"Discriminator_{res}")
+        if fading:
+            self.set_alpha(0.0)
+        self._make_train_step()
+
+    def set_alpha(self, alpha: float):
+        """Weight of the new blocks while fading, in [0, 1]."""
+        if self.fading:
+            self._g_fade[self.size].alpha.assign(alpha)
+            self._d_fade[self.size].alpha.assign(alpha)
+
+    @property
+    def full_size(self) -> bool:
+        return self.size == self.img_size[0]
+
+    def sample(self, n: int = 1, viseme_ids=None, noise=None):
+        """Generate n clips in [-1, 1] at img_size (upsampled below the last stage)."""
+        clips = super().sample(n, viseme_ids, noise)
+        if self.full_size:
+            return clips
+        shape = tf.shape(clips)
+        frames = tf.reshape(clips, tf.concat([[shape[0] * shape[1]], shape[2:]], 0))
+        frames = tf.image.resize(tf.cast(frames, tf.float32), self.img_size, method="bilinear")
+        return tf.reshape(frames, [shape[0], shape[1], self.img_size[0], self.img_size[1], 3])
@@ -1,7 +1,17 @@
+from functools import lru_cache
 from nltk.corpus import cmudict
 
-# Load CMU dict once
-CMU = cmudict.dict()
+
+@lru_cache(maxsize=1)
+def _cmu() -> dict:
+    """CMU dict, loaded once on first use (not on import: training only needs VISEME_CLASSES)."""
+    return cmudict.dict()
+
+
+def __getattr__(name):
+    if name == "CMU":
+        return _cmu()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Mapping: phonemes → viseme class
 PHONEME_TO_VISEME = {
@@ -42,21 +52,22 @@ PHONEME_TO_VISEME = {
     "ay": "12_Complex_Sounds",
 }
 
-# List of viseme classes
+# List of viseme classes (dataset / model directory names)
 VISEME_CLASSES = [
     "01_Closed_Lips", "02_Teeth_Touching", "03_Open_Mouth", "04_Rounded_Lips",
     "05_Tongue_Behind_Teeth", "06_Retroflex", "07_Fricative_Sibilant",
-    "08_Nasal", "09_Lateral", "10_Semi_Vowel", "12_Complex_Sounds"
+    "08_Nasal", "09_Lateral", "10_Semi_Vowel", "11_Additional_Consonants", "12_Complex_Sounds"
 ]
 
 
 def word_to_phonemes(word: str) -> list[str]:
     """Convert a word to its CMU phoneme sequence (stress markers stripped)."""
     w = word.lower()
-    if w not in CMU:
+    cmu = _cmu()
+    if w not in cmu:
         raise ValueError(f"No phonemes found for word '{word}' in CMUdict.")
     # Strip stress markers like AH0 → ah
-    return [p.lower().strip("0123456789") for p in CMU[w][0]]
+    return [p.lower().strip("0123456789") for p in cmu[w][0]]
 
 
 def phonemes_to_visemes(phonemes: list[str]) -> list[str]:
@@ -0,0 +1,74 @@
+import contextlib
+import json
+import os
+from functools import lru_cache
+from typing import Optional
+import tensorflow as tf
+
+
+def tf_config() -> dict:
+    """Parsed TF_CONFIG environment variable ({} if unset)."""
+    return json.loads(os.environ.get("TF_CONFIG") or "{}")
+
+
+def num_workers() -> int:
+    cluster = tf_config().get("cluster", {})
+    return len(cluster.get("chief", [])) + len(cluster.get("worker", [])) or 1
+
+
+def is_chief() -> bool:
+    """True for the process that writes checkpoints, logs and exports: the "chief"
+    task if the cluster has one, else worker 0 (and any single-process run).
+    """
+    cfg = tf_config()
+    task = cfg.get("task", {})
+    if not task:
+        return True
+    if "chief" in cfg.get("cluster", {}):
+        return task.get("type") == "chief"
+    return task.get("type") == "worker" and int(task.get("index", 0)) == 0
+
+
+@lru_cache(maxsize=None)
+def get_strategy() -> Optional[tf.distribute.Strategy]:
+    """MultiWorkerMirroredStrategy when TF_CONFIG describes more than one worker, else
+    None (plain single-process training). Created once per process; it has to be
+    created before TensorFlow runs any op, so call this first.
+    """
+    if num_workers() <= 1:
+        return None
+    options = tf.distribute.experimental.CommunicationOptions(
+        implementation=tf.distribute.experimental.CommunicationImplementation.RING)
+    strategy = tf.distribute.MultiWorkerMirroredStrategy(communication_options=options)
+    print(f"[INFO] MultiWorkerMirroredStrategy: {strategy.num_replicas_in_sync} replicas, "
+          f"{'chief' if is_chief() else 'worker'} task")
+    return strategy
+
+
+def scope(strategy: Optional[tf.distribute.Strategy]):
+    """strategy.scope(), or a no-op context without a strategy."""
+    return strategy.scope() if strategy is not None else contextlib.nullcontext()
+
+
+def distribute_dataset(strategy: tf.distribute.Strategy, ds: tf.data.Dataset) -> tf.data.Dataset:
+    """Shard a globally batched dataset across workers by element (AutoShardPolicy.DATA)
+    and split each global batch across the local replicas.
+    """
+    options = tf.data.Options()
+    options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.DATA
+    return strategy.experimental_distribute_dataset(ds.with_options(options))
+
+
+def cross_worker_mean(strategy: tf.distribute.Strategy, value: float) -> float:
+    """Mean of a per-worker float over all replicas; every worker gets the same result.
+    Use it for values that drive control flow (e.g. early stopping), so no worker
+    leaves the training loop while the others wait in a collective.
+    """
+    v = tf.constant(value, tf.float64)
+    out = strategy.run(lambda: tf.distribute.get_replica_context().all_reduce(tf.distribute.ReduceOp.MEAN, v))
+    return float(strategy.experimental_local_results(out)[0])
+
+
+# Example Usage
+# TF_CONFIG='{"cluster": {"worker": ["host1:12345", "host2:12345"]}, "task": {"type": "worker", "index": 0}}' \
+#     python scripts/train_all.py --paths config/paths.yaml --subset 03_Open_Mouth
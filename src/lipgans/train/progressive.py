@@ -0,0 +1,50 @@
+from typing import Optional, Tuple
+
+
+class ProgressiveSchedule:
+    """
+    Epoch schedule of a ProgressiveVisemeGAN: `stage_epochs` epochs at each stage
+    below full size, the remaining epochs at full size. Each stage after the first
+    starts by fading its new blocks in over `fade_epochs` epochs.
+
+        sched = ProgressiveSchedule(len(gan.stage_sizes), stage_epochs=10, fade_epochs=5)
+        stage, fading = sched.phase(epoch)
+        gan.set_alpha(sched.alpha(epoch, step / steps_per_epoch))
+    """
+
+    def __init__(self, n_stages: int, stage_epochs: int, fade_epochs: int):
+        self.n_stages = n_stages
+        self.stage_epochs = max(1, stage_epochs)
+        self.fade_epochs = max(0, fade_epochs)
+
+    def stage(self, epoch: int) -> int:
+        """Stage trained in `epoch` (0-based)."""
+        return min(epoch // self.stage_epochs, self.n_stages - 1)
+
+    def phase(self, epoch: int) -> Tuple[int, bool]:
+        """(stage, fading) at the start of `epoch`."""
+        stage = self.stage(epoch)
+        return stage, stage > 0 and epoch - stage * self.stage_epochs < self.fade_epochs
+
+    def alpha(self, epoch: int, progress: float = 0.0) -> float:
+        """Fade-in weight `progress` (0..1) of the way through `epoch`."""
+        if self.fade_epochs == 0:
+            return 1.0
+        done = epoch - self.stage(epoch) * self.stage_epochs + min(max(progress, 0.0), 1.0)
+        return min(1.0, done / self.fade_epochs)
+
+    def full_size_epoch(self) -> int:
+        """First epoch at full size."""
+        return (self.n_stages - 1) * self.stage_epochs
+
+    @staticmethod
+    def progress(step: int, steps: Optional[int]) -> float:
+        """Fraction of an epoch done after `step` steps; 0 when the epoch length is unknown."""
+        return step / steps if steps else 0.0
+
+
+# Example Usage
+# sched = ProgressiveSchedule(3, stage_epochs=10, fade_epochs=5)
+# sched.phase(12)          # (1, True): 32x32 stage, fading in
+# sched.alpha(12, 0.5)     # 0.5
+# sched.phase(16)          # (1, False)
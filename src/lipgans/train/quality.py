@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+
+from ..utils.image import to_model_range
+
+
+class ClipFeatures:
+    """Small fixed (never trained) CNN mapping clips (B, T, H, W, 3) in [-1, 1] to
+    feature vectors: per-frame conv features averaged over time, plus their mean
+    absolute frame-to-frame change (motion). Weights come from a fixed seed, so
+    scores are comparable across runs; it always runs in float32.
+    """
+    def __init__(self, img_size=(64, 64), seed: int = 1234):
+        frames = layers.Input(shape=(img_size[0], img_size[1], 3), dtype="float32")
+        x = frames
+        for i, filters in enumerate((32, 64, 128)):
+            x = layers.Conv2D(filters, 3, strides=2, padding="same", dtype="float32",
+                              kernel_initializer=tf.keras.initializers.HeNormal(seed=seed + i))(x)
+            x = layers.LeakyReLU(0.2, dtype="float32")(x)
+        x = layers.GlobalAveragePooling2D(dtype="float32")(x)
+        self.frame_net = tf.keras.Model(frames, x, name="QualityFrameFeatures")
+        self._features = tf.function(self._clip_features, reduce_retracing=True)
+
+    def _clip_features(self, clips):
+        shape = tf.shape(clips)
+        f = self.frame_net(tf.reshape(clips, tf.concat([[shape[0] * shape[1]], shape[2:]], 0)), training=False)
+        f = tf.reshape(f, [shape[0], shape[1], -1])
+        motion = tf.reduce_mean(tf.abs(f[:, 1:] - f[:, :-1]), axis=1)
+        motion = tf.where(shape[1] > 1, motion, tf.zeros_like(motion))  # NaN (empty mean) for single frames
+        return tf.concat([tf.reduce_mean(f, axis=1), motion], axis=-1)
+
+    def __call__(self, clips) -> np.ndarray:
+        return self._features(tf.cast(clips, tf.float32)).numpy()
+
+
+def kid(real: np.ndarray, fake: np.ndarray, subsets: int = 10, subset_size: int = 100, seed: int = 0) -> float:
+    """Kernel Inception Distance: unbiased MMD^2 with the cubic polynomial kernel
+    (x.y / d + 1)^3, averaged over random subsets. Lower is better, ~0 when the
+    feature distributions match.
+    """
+    rng = np.random.default_rng(seed)
+    d = real.shape[1]
+    m = min(subset_size, len(real), len(fake))
+    if m < 2:
+        raise ValueError("KID needs at least 2 real and 2 fake samples")
+    scores = []
+    for _ in range(subsets):
+        x = real[rng.choice(len(real), m, replace=False)].astype(np.float64)
+        y = fake[rng.choice(len(fake), m, replace=False)].astype(np.float64)
+        kxx = (x @ x.T / d + 1) ** 3
+        kyy = (y @ y.T / d + 1) ** 3
+        kxy = (x @ y.T / d + 1) ** 3
+        scores.append((kxx.sum() - np.trace(kxx)) / (m * (m - 1))
+                      + (kyy.sum() - np.trace(kyy)) / (m * (m - 1))
+                      - 2 * kxy.mean())
+    return float(np.mean(scores))
+
+
+def _spread(feats: np.ndarray) -> float:
+    """Mean distance of features to their centroid (sample diversity)."""
+    return float(np.linalg.norm(feats - feats.mean(axis=0), axis=1).mean())
+
+
+@dataclass
+class QualityResult:
+    epoch: int
+    kid: float
+    diversity: float      # fake feature spread / real feature spread; ~1 is healthy
+    improved: bool
+    collapsed: bool
+    stop: bool
+
+
+class QualityMonitor:
+    """
+    Periodic held-out evaluation of a GAN: KID between features of held-out real
+    clips and generated clips, a diversity ratio for mode-collapse alerts, and
+    patience-based early stopping on KID.
+
+    Real features are computed once. `evaluate` samples `n_fake` clips in batches
+    of `batch_size` (conditional GANs get the held-out clips' viseme ids) from the
+    same `seed`-ed latents every time, so successive scores differ only by the model
+    and the workers of a distributed run score the same model alike; `agree` maps
+    the local KID to the value all workers share (e.g. the cross-worker mean) so
+    their early-stopping decisions cannot diverge.
+    """
+
+    def __init__(self, real_clips: np.ndarray, real_ids: Optional[np.ndarray] = None, batch_size: int = 64,
+                 n_fake: Optional[int] = None, patience: int = 4, min_delta: float = 0.0,
+                 min_epochs: int = 0, collapse_ratio: float = 0.25, seed: int = 0,
+                 agree: Optional[Callable[[float], float]] = None):
+        self.batch_size = batch_size
+        self.seed = seed
+        self.agree = agree
+        self.real_ids = real_ids
+        self.n_fake = n_fake or len(real_clips)
+        self.patience = patience
+        self.min_delta = min_delta
+        self.min_epochs = min_epochs
+        self.collapse_ratio = collapse_ratio
+        self.extractor = ClipFeatures(real_clips.shape[2:4])
+        self.real = self._features(real_clips[i:i + batch_size] for i in range(0, len(real_clips), batch_size))
+        self.real_spread = _spread(self.real)
+        self.best: Optional[float] = None
+        self.best_epoch = 0
+        self._bad = 0
+
+    def _features(self, batches) -> np.ndarray:
+        return np.concatenate([self.extractor(to_model_range(b)) for b in batches], axis=0)
+
+    def _fake_batches(self, gan):
+        noise = np.random.default_rng(self.seed).standard_normal((self.n_fake, gan.z_dim)).astype(np.float32)
+        for i in range(0, self.n_fake, self.batch_size):
+            n = min(self.batch_size, self.n_fake - i)
+            ids = None
+            if self.real_ids is not None:
+                ids = tf.constant(np.resize(np.roll(self.real_ids, -i), n), tf.int32)
+            # back to [0, 255] so real and fake go through the same to_model_range
+            yield (tf.cast(gan.sample(n, ids, noise=tf.constant(noise[i:i + n])), tf.float32) + 1.0) * 127.5
+
+    def reset(self):
+        """Forget the best score and the patience count (e.g. when the model grows)."""
+        self.best, self.best_epoch, self._bad = None, 0, 0
+
+    def evaluate(self, gan, epoch: int) -> QualityResult:
+        fake = self._features(self._fake_batches(gan))
+        score = kid(self.real, fake)
+        if self.agree is not None:
+            score = self.agree(score)
+        diversity = _spread(fake) / max(self.real_spread, 1e-12)
+        improved = self.best is None or score < self.best - self.min_delta
+        if improved:
+            self.best, self.best_epoch, self._bad = score, epoch, 0
+        else:
+            self._bad += 1
+        stop = self.patience > 0 and epoch >= self.min_epochs and self._bad >= self.patience
+        return QualityResult(epoch, score, diversity, improved, diversity < self.collapse_ratio, stop)
+
+
+# Example Usage
+# real = load_split_clips(cfg.paths.cropped_dir, "03_Open_Mouth", split="holdout", holdout=0.1)
+# monitor = QualityMonitor(real, patience=4, min_epochs=20)
+# res = monitor.evaluate(gan, epoch)
+# if res.collapsed: print("mode collapse?")
+# if res.stop: break
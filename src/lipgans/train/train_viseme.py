@@ -1,49 +1,446 @@
 # src/lipgans/train/train_viseme.py
+import gc
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from functools import partial
 from pathlib import Path
+import numpy as np
 import tensorflow as tf
-from ..models.gan3d import VisemeGAN
-from ..data.dataset import make_dataset
+from ..models.gan3d import ConditionalVisemeGAN, ProgressiveVisemeGAN, VisemeGAN
+from ..data.dataset import (load_split_clips, make_conditional_dataset, make_dataset, make_repeated_dataset,
+                            viseme_classes)
+from ..generate.registry import CONDITIONAL_DIR  # models_root subdirectory of the class-conditional model
+from ..utils.checkpoint import TrainingCheckpoint
 from ..utils.io import save_frames_and_models
+from ..utils.parallel import map_isolated, resolve_workers
+from ..utils.precision import make_optimizer, set_policy
+from ..utils.telemetry import TrainingTelemetry
+from .distributed import cross_worker_mean, distribute_dataset, get_strategy, is_chief, num_workers, scope
+from .progressive import ProgressiveSchedule
+from .quality import QualityMonitor, QualityResult
 from ..config import Config
+from ..phonemes import VISEME_CLASSES
 
-VISEME_CLASSES = [
-    "01_Closed_Lips", "02_Teeth_Touching", "03_Open_Mouth", "04_Rounded_Lips",
-    "05_Tongue_Behind_Teeth", "06_Retroflex", "07_Fricative_Sibilant",
-    "08_Nasal", "09_Lateral", "10_Semi_Vowel", "11_Additional_Consonants", "12_Complex_Sounds"
-]
+# Written to a class's model directory when its training run completes
+DONE_FILE = "training_summary.json"
 
-def train_one_class(cfg: Config, viseme: str, max_batches: int | None = None):
-    print(f"Training viseme: {viseme}")
-    ds = make_dataset(cfg.paths.cropped_dir, viseme,
-                      batch_size=cfg.train.batch_size,
-                      target_frames=cfg.train.target_frames,
-                      img_size=tuple(cfg.train.img_size))
-    gan = VisemeGAN(z_dim=cfg.train.z_dim,
-                    target_frames=cfg.train.target_frames,
-                    img_size=tuple(cfg.train.img_size))
-    g_opt = tf.keras.optimizers.Adam(cfg.train.lr)
-    d_opt = tf.keras.optimizers.Adam(cfg.train.lr)
+# Subdirectory of a class's model directory holding TrainingCheckpoint saves
+CHECKPOINT_DIR = "checkpoints"
+
+# Generator export of the lowest-KID evaluation so far
+BEST_GENERATOR = "generator_best.model.keras"
+
+# Shuffle seed shared by all workers of a multi-worker run (see make_repeated_dataset)
+SHARD_SEED = 1234
+
+def _check_fresh_start(save_dir: Path, resume: bool, fresh: bool):
+    """Refuse to start a new run over the checkpoints of a previous one (an
+    interrupted run is continued with `resume`) unless `fresh` is given, in which
+    case the old checkpoints are discarded. Call before building the GAN.
+    """
+    ckpt_dir = save_dir / CHECKPOINT_DIR
+    if resume or not tf.train.latest_checkpoint(str(ckpt_dir / "last")):
+        return
+    if not fresh:
+        raise FileExistsError(f"{ckpt_dir} holds checkpoints of a previous run; "
+                              f"continue it with --resume or discard them with --fresh")
+    if is_chief():
+        print(f"[INFO] Discarding the checkpoints in {ckpt_dir}")
+        shutil.rmtree(ckpt_dir)
+
+def _open_checkpoint(cfg: Config, gan, g_opt, d_opt, save_dir: Path, resume: bool):
+    """TrainingCheckpoint under save_dir/checkpoints and the epoch to start from
+    (see _check_fresh_start for runs that do not resume). Only the chief worker
+    writes; every worker restores.
+    """
+    ckpt_dir = save_dir / CHECKPOINT_DIR
+    ckpt = TrainingCheckpoint(gan, g_opt, d_opt, ckpt_dir,
+                              keep_last=cfg.checkpoint.keep_last,
+                              keep_best=cfg.checkpoint.keep_best,
+                              async_save=cfg.checkpoint.async_save,
+                              write=is_chief())
+    if not resume:
+        ckpt.best_metric = None  # a non-chief may have read best.json before the chief removed it
+        return ckpt, 0
+    return ckpt, ckpt.restore()
+
+def _end_of_epoch(cfg: Config, gan, ckpt: TrainingCheckpoint, epoch: int, save_dir: Path,
+                  quality: QualityResult | None = None, counters: dict | None = None):
+    """Every CHECKPOINT.every_epochs (and after the last or early-stopped epoch):
+    checkpoint the training state in the background, then write samples and the
+    generator export. An evaluation with a new best KID is also checkpointed
+    (kept under checkpoints/best) and exported as BEST_GENERATOR. Files are only
+    written by the chief worker. Progressive stages below full size write samples
+    only: inference takes the latest generator_epoch_N export as the class's model.
+    `counters` are saved with the checkpoint (see TrainingCheckpoint.counters).
+    """
+    metric = quality.kid if quality is not None else None
+    due = epoch % cfg.checkpoint.every_epochs == 0 or epoch == cfg.train.epochs or (quality and quality.stop)
+    best = ckpt.improves(metric)
+    if due or best:
+        ckpt.save(epoch, metric=metric, counters=counters)
+    if not is_chief():
+        return
+    if due:
+        export = cfg.checkpoint.export_generator and getattr(gan, "full_size", True)
+        save_frames_and_models(gan, epoch, save_dir, cfg, save_full_model=export)
+    if best and cfg.checkpoint.export_generator:
+        gan.gen.save((save_dir / BEST_GENERATOR).as_posix())
+
+def _open_quality(cfg: Config, classes: list, ckpt: TrainingCheckpoint,
+                  conditional: bool = False) -> QualityMonitor | None:
+    """QualityMonitor on the held-out clips of `classes`, None if disabled or no class
+    has held-out clips. Resumed runs keep the best KID of their checkpoint. Workers of
+    a multi-worker run share one KID (the cross-worker mean).
+    """
+    q = cfg.quality
+    if not q.enabled:
+        return None
+    strategy = get_strategy()
+    per_class = max(2, q.max_clips // len(classes))
+    clips, ids = [], []
+    for i, viseme in enumerate(classes):
+        try:
+            real = load_split_clips(cfg.paths.cropped_dir, viseme,
+                                    target_frames=cfg.train.target_frames,
+                                    img_size=tuple(cfg.train.img_size),
+                                    cache_dir=cfg.paths.cache_dir,
+                                    split="holdout", holdout=q.holdout, max_clips=per_class)
+        except (FileNotFoundError, ValueError):
+            continue
+        clips.append(real)
+        ids.append(np.full(len(real), i, dtype=np.int32))
+    if not clips or sum(len(c) for c in clips) < 2:
+        print(f"⚠️ Fewer than 2 held-out clips for {', '.join(classes)}; quality evaluation disabled")
+        return None
+    monitor = QualityMonitor(np.concatenate(clips), np.concatenate(ids) if conditional else None,
+                             batch_size=q.batch_size, patience=q.patience, min_delta=q.min_delta,
+                             min_epochs=q.min_epochs, collapse_ratio=q.collapse_ratio,
+                             agree=partial(cross_worker_mean, strategy) if strategy else None)
+    monitor.best = ckpt.best_metric
+    return monitor
+
+def _check_quality(monitor: QualityMonitor | None, cfg: Config, gan, epoch: int, run: str,
+                   tel: TrainingTelemetry) -> QualityResult | None:
+    """Evaluate every QUALITY.every_epochs; report KID/diversity and collapse alerts."""
+    if monitor is None or epoch % cfg.quality.every_epochs:
+        return None
+    t0 = time.perf_counter()
+    res = monitor.evaluate(gan, epoch)
+    tel.record("quality", dict(kid=res.kid, diversity=res.diversity, eval_s=time.perf_counter() - t0))
+    print(f"[{run}] Quality @ epoch {epoch} | KID={res.kid:.5f} diversity={res.diversity:.2f} "
+          f"(best {monitor.best:.5f} @ epoch {monitor.best_epoch})")
+    if res.collapsed:
+        print(f"⚠️ [{run}] Possible mode collapse: generated diversity is {res.diversity:.2f}x the real data's")
+    if res.stop:
+        print(f"[{run}] Early stopping: no KID improvement in {monitor.patience} evaluations")
+    return res
+
+def _open_telemetry(cfg: Config, run: str, start_step: int) -> TrainingTelemetry:
+    """Step timing for `run`; with TELEMETRY.enabled off (or on a non-chief worker) it
+    still times epochs but writes nothing.
+    """
+    t = cfg.telemetry
+    enabled = t.enabled and is_chief()
+    return TrainingTelemetry(t.log_dir or Path(cfg.paths.models_root) / "logs", run,
+                             log_every=t.log_every,
+                             tensorboard=enabled and t.tensorboard,
+                             jsonl=enabled and t.jsonl,
+                             profile_start=t.profile_start,
+                             profile_steps=t.profile_steps if enabled else 0,
+                             start_step=start_step)
+
+def _timing(stats: dict) -> str:
+    return (f"{stats['epoch_s']:.1f}s, {stats['clips_per_s']:.1f} clips/s, "
+            f"data wait {100 * stats['data_wait_frac']:.0f}%")
 
+def _class_batches(cfg: Config, viseme: str, strategy, max_batches: int | None, img_size=None):
+    """Training batches of one class and the steps per epoch (None: one pass over the
+    data), at `img_size` (default TRAINING.img_size). Under a multi-worker strategy the
+    global batch is TRAINING.batch_size per replica, and the seeded stream is sharded
+    across workers with a fixed step count.
+    """
+    kwargs = dict(target_frames=cfg.train.target_frames,
+                  img_size=tuple(img_size or cfg.train.img_size),
+                  cache_dir=cfg.paths.cache_dir,
+                  split="train" if cfg.quality.enabled else "all",
+                  holdout=cfg.quality.holdout)
+    if strategy is None:
+        return make_dataset(cfg.paths.cropped_dir, viseme, batch_size=cfg.train.batch_size, **kwargs), max_batches or None
+    ds, steps_per_epoch = make_repeated_dataset(cfg.paths.cropped_dir, viseme, seed=SHARD_SEED,
+                                                batch_size=cfg.train.batch_size * strategy.num_replicas_in_sync,
+                                                **kwargs)
+    steps = min(steps_per_epoch, max_batches) if max_batches else steps_per_epoch
+    return iter(distribute_dataset(strategy, ds)), steps
+
+def _build_gan(cfg: Config, strategy, **extra):
+    """GAN and its two optimizers (slots included), created in the strategy's scope
+    when distributed. Per-class GANs are progressive with PROGRESSIVE.enabled.
+    """
+    set_policy(cfg.train.mixed_precision)
+    if "num_classes" in extra:
+        cls = ConditionalVisemeGAN
+    elif cfg.progressive.enabled:
+        cls, extra = ProgressiveVisemeGAN, dict(extra, start_size=cfg.progressive.start_size)
+    else:
+        cls = VisemeGAN
+    with scope(strategy):
+        gan = cls(z_dim=cfg.train.z_dim,
+                  target_frames=cfg.train.target_frames,
+                  img_size=tuple(cfg.train.img_size),
+                  jit_compile=cfg.train.jit_compile,
+                  strategy=strategy,
+                  **extra)
+        g_opt = make_optimizer(cfg.train.lr, cfg.train.mixed_precision)
+        d_opt = make_optimizer(cfg.train.lr, cfg.train.mixed_precision)
+        gen, disc = gan.state_models
+        g_opt.build(gen.trainable_variables)
+        d_opt.build(disc.trainable_variables)
+    return gan, g_opt, d_opt
+
+def _enter_phase(cfg: Config, gan: ProgressiveVisemeGAN, sched: ProgressiveSchedule, epoch: int, viseme: str,
+                 strategy, max_batches: int | None, data, monitor: QualityMonitor | None, tel: TrainingTelemetry):
+    """Switch a progressive GAN to the stage / fade-in of `epoch`. Returns the training
+    batches for the stage resolution (rebuilt when the resolution changes).
+    """
+    stage, fading = sched.phase(epoch)
+    size = gan.stage_sizes[stage]
+    if data is None or size != gan.size:
+        data = _class_batches(cfg, viseme, strategy, max_batches, img_size=(size, size))
+    gan.set_stage(stage, fading)
+    if monitor is not None and epoch == sched.full_size_epoch():
+        monitor.reset()  # KID of upsampled low-resolution samples is not comparable
+    tel.record("stage", dict(stage=stage, size=size, fading=int(fading)))
+    print(f"[{viseme}] Stage {stage + 1}/{sched.n_stages}: {size}x{size}{', fading in' if fading else ''}")
+    return data
+
+def train_one_class(cfg: Config, viseme: str, max_batches: int | None = None, resume: bool = False,
+                    fresh: bool = False) -> dict:
+    """Train one viseme GAN; returns a summary (epochs, clips seen, wall time, clips/s)
+    that is also written to <models_root>/<viseme>/DONE_FILE. With `resume`, training
+    continues from the latest checkpoint of the class and the summary adds up all
+    sessions of the run (`sessions` counts them); otherwise existing checkpoints make
+    it fail unless `fresh` discards them.
+
+    When TF_CONFIG describes a multi-worker cluster, every worker runs this with the
+    same arguments and the class trains data-parallel across the cluster
+    (MultiWorkerMirroredStrategy); only the chief writes checkpoints, logs and exports.
+
+    With PROGRESSIVE.enabled the GAN grows from PROGRESSIVE.start_size to full size
+    (see ProgressiveSchedule), with the data resized for each stage. Quality results
+    below full size are logged but drive neither best exports nor early stopping.
+    """
+    strategy = get_strategy()  # before any other TF op
+    print(f"Training viseme: {viseme}")
+    t0 = time.perf_counter()
     save_dir = Path(cfg.paths.models_root) / viseme
+    _check_fresh_start(save_dir, resume, fresh)
+    global_batch = cfg.train.batch_size * strategy.num_replicas_in_sync if strategy else None
+    gan, g_opt, d_opt = _build_gan(cfg, strategy)
+    sched = None
+    if isinstance(gan, ProgressiveVisemeGAN):
+        sched = ProgressiveSchedule(len(gan.stage_sizes), cfg.progressive.stage_epochs, cfg.progressive.fade_epochs)
+        if cfg.train.epochs <= sched.full_size_epoch():
+            print(f"⚠️ {cfg.train.epochs} epochs end before the full-size stage (epoch {sched.full_size_epoch() + 1})")
+        data = None
+    else:
+        data = _class_batches(cfg, viseme, strategy, max_batches)
+
     save_dir.mkdir(parents=True, exist_ok=True)
+    ckpt, start = _open_checkpoint(cfg, gan, g_opt, d_opt, save_dir, resume)
+    tel = _open_telemetry(cfg, viseme, int(ckpt.step))
+    monitor = _open_quality(cfg, [viseme], ckpt)
 
-    for epoch in range(cfg.train.epochs):
+    # Totals of earlier sessions of a resumed run
+    clips, wall0 = ckpt.counters.get("clips", 0), ckpt.counters.get("wall_s", 0.0)
+    sessions = ckpt.counters.get("sessions", 1 if start else 0) + 1
+    if start and not ckpt.counters:
+        print(f"⚠️ [{viseme}] No counters saved with the checkpoint; the summary covers this session only")
+    last_epoch, epoch_steps = start, None
+    for epoch in range(start, cfg.train.epochs):
+        if sched is not None and (data is None or sched.phase(epoch) != (gan.stage, gan.fading)):
+            data = _enter_phase(cfg, gan, sched, epoch, viseme, strategy, max_batches, data, monitor, tel)
+        ds, steps = data
         g_loss = d_loss = None
-        for step, real in enumerate(ds):
+        for i, real in enumerate(tel.batches(ds, limit=steps)):
+            if sched is not None and gan.fading:
+                gan.set_alpha(sched.alpha(epoch, sched.progress(i, steps or epoch_steps)))
             g_loss, d_loss = gan.train_step(real, g_opt, d_opt)
-            if max_batches and step + 1 >= max_batches:
-                break
+            tel.step_done(real, g_loss, d_loss, clips=global_batch)
+        stats = tel.end_epoch(epoch + 1)
+        clips += stats["clips"]
+        epoch_steps = stats["steps"]
+        ckpt.step.assign_add(stats["steps"])
 
         print(f"[{viseme}] Epoch {epoch+1}/{cfg.train.epochs} | "
-              f"G={float(g_loss):.4f} D={float(d_loss):.4f}")
+              f"G={float(g_loss):.4f} D={float(d_loss):.4f} | {_timing(stats)}")
+
+        quality = _check_quality(monitor, cfg, gan, epoch + 1, viseme, tel)
+        if sched is not None and not gan.full_size:
+            quality = None
+        counters = dict(clips=clips, wall_s=wall0 + time.perf_counter() - t0, sessions=sessions)
+        _end_of_epoch(cfg, gan, ckpt, epoch + 1, save_dir, quality, counters)
+        last_epoch = epoch + 1
+        if quality is not None and quality.stop:
+            break
+    ckpt.wait()
+    tel.close()
+
+    wall = wall0 + time.perf_counter() - t0
+    summary = dict(viseme=viseme, epochs=cfg.train.epochs, stopped_at=last_epoch, clips=clips,
+                   wall_s=round(wall, 2), clips_per_s=round(clips / max(wall, 1e-9), 2),
+                   sessions=sessions, best_kid=ckpt.best_metric, workers=num_workers())
+    if is_chief():
+        (save_dir / DONE_FILE).write_text(json.dumps(summary, indent=2), encoding="utf-8")
 
-        if (epoch + 1) % 10 == 0:
-            save_frames_and_models(gan, epoch+1, save_dir, cfg)
+    # Free this class's models, optimizers and graphs before the next one
+    del gan, g_opt, d_opt, data, ckpt, tel, monitor
+    tf.keras.backend.clear_session()
+    gc.collect()
+    return summary
 
-def train_all(cfg: Config, subset=None, max_batches: int | None = None):
+def _completed(cfg: Config, viseme: str) -> dict | None:
+    """Summary of a finished run of `viseme` with the configured epoch count, else None."""
+    done = Path(cfg.paths.models_root) / viseme / DONE_FILE
+    if not done.exists():
+        return None
+    summary = json.loads(done.read_text(encoding="utf-8"))
+    return summary if summary.get("epochs") == cfg.train.epochs else None
+
+def _init_train_worker(intra_threads: int, inter_threads: int, core_slices):
+    """Pin a training worker to its own CPU slice and size TF's thread pools to it.
+    Runs before TensorFlow creates its runtime in the (spawned) worker.
+    """
+    cores = core_slices.get()
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(intra_threads)
+    tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+
+def _train_class_job(viseme: str, cfg: Config, max_batches: int | None, resume: bool, fresh: bool) -> dict:
+    return train_one_class(cfg, viseme, max_batches=max_batches, resume=resume, fresh=fresh)
+
+def _print_summary(rows):
+    print(f"{'viseme':<28} {'status':<8} {'epochs':>6} {'wall s':>9} {'clips/s':>9}")
+    for r in rows:
+        print(f"{r['viseme']:<28} {r['status']:<8} {r.get('stopped_at', r.get('epochs', '-'))!s:>6} "
+              f"{r.get('wall_s', '-')!s:>9} {r.get('clips_per_s', '-')!s:>9}")
+
+def train_all(cfg: Config, subset=None, max_batches: int | None = None, resume: bool = False,
+              workers: int | None = None, fresh: bool = False):
+    """Train every class in `subset` (default VISEME_CLASSES).
+
+    With TRAINING.workers > 1 classes train concurrently in spawned processes, each
+    pinned to its own slice of CPU cores with TF intra-op threads sized to match
+    (TRAINING.threads_per_worker, 0 = cores / workers). A failing class does not stop
+    the others. With `resume`, classes already trained for the configured number of
+    epochs are skipped and the others continue from their latest checkpoint. Without it,
+    nothing is trained if a class still has checkpoints of a previous run, unless
+    `fresh` discards them. Prints a per-class summary of wall time and throughput.
+
+    In a multi-worker cluster (TF_CONFIG) classes train one after another, each one
+    data-parallel across all workers; TRAINING.workers is ignored.
+    """
     classes = subset or VISEME_CLASSES
+    if not resume and not fresh:
+        for v in classes:
+            _check_fresh_start(Path(cfg.paths.models_root) / v, resume, fresh)
+    rows, todo = [], []
     for v in classes:
-        train_one_class(cfg, v, max_batches=max_batches)
+        done = _completed(cfg, v) if resume else None
+        if done:
+            print(f"[INFO] {v}: already trained for {done['epochs']} epochs, skipping")
+            rows.append(dict(done, status="skipped"))
+        else:
+            todo.append(v)
+
+    workers = min(resolve_workers(workers or cfg.train.workers), max(len(todo), 1))
+    if num_workers() > 1:
+        workers = 1
+    job = partial(_train_class_job, cfg=cfg, max_batches=max_batches, resume=resume, fresh=fresh)
+    if workers <= 1:
+        results = map_isolated(job, todo)
+    else:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        threads = cfg.train.threads_per_worker or max(1, len(cpus) // workers)
+        ctx = multiprocessing.get_context("spawn")
+        core_slices = ctx.Queue()
+        for i in range(workers):
+            core_slices.put(cpus[i * threads:(i + 1) * threads])
+        print(f"[INFO] Training {len(todo)} classes on {workers} workers x {threads} threads")
+        results = map_isolated(job, todo, workers=workers, initializer=_init_train_worker,
+                               initargs=(threads, cfg.train.inter_op_threads, core_slices),
+                               start_method="spawn")
+
+    for res in results:
+        if res.ok:
+            rows.append(dict(res.value, status="trained"))
+        else:
+            print(f"❌ {res.item}: {res.error}")
+            rows.append(dict(viseme=res.item, status="failed", wall_s=round(res.elapsed, 2)))
+
+    order = {v: i for i, v in enumerate(classes)}
+    rows.sort(key=lambda r: order[r["viseme"]])
+    _print_summary(rows)
+    return rows
+
+def train_conditional(cfg: Config, subset=None, max_batches: int | None = None, resume: bool = False,
+                      fresh: bool = False):
+    """Train one ConditionalVisemeGAN on every viseme directory under cropped_dir
+    (or `subset`). Saves to models_root/conditional with classes.json mapping
+    viseme ids to class names. With `resume`, continues from the latest checkpoint;
+    checkpoints of a previous run otherwise need `fresh` (see train_one_class).
+    Runs data-parallel across a TF_CONFIG cluster like train_one_class.
+    """
+    strategy = get_strategy()  # before any other TF op
+    replicas = strategy.num_replicas_in_sync if strategy else 1
+    save_dir = Path(cfg.paths.models_root) / CONDITIONAL_DIR
+    _check_fresh_start(save_dir, resume, fresh)
+    if cfg.progressive.enabled:
+        print("⚠️ PROGRESSIVE applies to per-class training; the conditional GAN trains at full size")
+    classes = subset or viseme_classes(cfg.paths.cropped_dir)
+    print(f"Training conditional GAN on {len(classes)} viseme classes")
+    ds, steps_per_epoch = make_conditional_dataset(cfg.paths.cropped_dir, classes,
+                                                   batch_size=cfg.train.batch_size * replicas,
+                                                   target_frames=cfg.train.target_frames,
+                                                   img_size=tuple(cfg.train.img_size),
+                                                   cache_dir=cfg.paths.cache_dir,
+                                                   split="train" if cfg.quality.enabled else "all",
+                                                   holdout=cfg.quality.holdout,
+                                                   seed=SHARD_SEED if strategy else None)
+    gan, g_opt, d_opt = _build_gan(cfg, strategy, num_classes=len(classes))
+
+    save_dir.mkdir(parents=True, exist_ok=True)
+    if is_chief():
+        (save_dir / "classes.json").write_text(json.dumps(classes, indent=2), encoding="utf-8")
+    ckpt, start = _open_checkpoint(cfg, gan, g_opt, d_opt, save_dir, resume)
+
+    tel = _open_telemetry(cfg, CONDITIONAL_DIR, int(ckpt.step))
+    monitor = _open_quality(cfg, classes, ckpt, conditional=True)
+
+    steps = min(steps_per_epoch, max_batches) if max_batches else steps_per_epoch
+    it = iter(distribute_dataset(strategy, ds) if strategy else ds)
+    for epoch in range(start, cfg.train.epochs):
+        g_loss = d_loss = None
+        for real, ids in tel.batches(it, limit=steps):
+            g_loss, d_loss = gan.train_step(real, g_opt, d_opt, ids)
+            tel.step_done(real, g_loss, d_loss, clips=cfg.train.batch_size * replicas if strategy else None)
+        stats = tel.end_epoch(epoch + 1)
+        ckpt.step.assign_add(stats["steps"])
+
+        print(f"[conditional] Epoch {epoch+1}/{cfg.train.epochs} | "
+              f"G={float(g_loss):.4f} D={float(d_loss):.4f} | {_timing(stats)}")
+
+        quality = _check_quality(monitor, cfg, gan, epoch + 1, CONDITIONAL_DIR, tel)
+        _end_of_epoch(cfg, gan, ckpt, epoch + 1, save_dir, quality)
+        if quality is not None and quality.stop:
+            break
+    ckpt.wait()
+    tel.close()
 
 
 
@@ -52,5 +449,8 @@ def train_all(cfg: Config, subset=None, max_batches: int | None = None):
 # Full training (all data, all epochs):
 # python scripts/train_all.py --paths config/paths.yaml --epochs 100
 
+# One class-conditional model for all visemes:
+# python scripts/train_all.py --paths config/paths.yaml --conditional
+
 # Debugging (just 5 batches per epoch):
 # python scripts/train_all.py --paths config/paths.yaml --epochs 2 --max_batches 
\ No newline at end of file
@@ -0,0 +1,168 @@
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+import tensorflow as tf
+
+
+def _variables_of(obj) -> list:
+    """Variables of a model, optimizer (Keras 2 or 3) or a bare tf.Variable, in a stable order."""
+    if isinstance(obj, tf.Variable):
+        return [obj]
+    v = obj.variables
+    return list(v() if callable(v) else v)
+
+
+def _build_optimizer(opt, model):
+    """Create optimizer slots now, so they can be checkpointed / restored before the first step."""
+    if not getattr(opt, "built", True) and hasattr(opt, "build"):
+        opt.build(model.trainable_variables)
+
+
+def _state(gen, disc, g_opt, d_opt) -> dict:
+    return dict(gen=gen, disc=disc, g_opt=g_opt, d_opt=d_opt,
+                step=tf.Variable(0, dtype=tf.int64, trainable=False, name="step"),
+                epoch=tf.Variable(0, dtype=tf.int64, trainable=False, name="epoch"))
+
+
+class TrainingCheckpoint:
+    """
+    Resumable training state of a GAN: generator, discriminator, both optimizers
+    (including loss-scale state), the global step and the epoch, saved with
+    tf.train.Checkpoint.
+
+    Checkpoints are written under `directory`:
+      last/   the `keep_last` most recent saves
+      best/   the `keep_best` saves with the lowest metric, plus best.json
+      counters.json   run totals passed to `save` (clips seen, wall time, ...), which
+                      `restore` loads into `counters` when they match its epoch
+
+    With `async_save`, `save` copies every variable into a shadow copy of the models
+    and optimizers (a fast device-side snapshot) and a background thread writes the
+    shadow checkpoint, which has the same object graph and restores into the live
+    objects. Call `wait()` before reading the files or exiting.
+
+    With `write` off (non-chief workers of a multi-worker run) `restore` still reads
+    `directory`, but `save` only tracks the epoch and best metric.
+    """
+
+    def __init__(self, gan, g_opt, d_opt, directory: Path, keep_last: int = 3, keep_best: int = 1,
+                 async_save: bool = True, write: bool = True):
+        self.directory = Path(directory)
+        gen, disc = gan.state_models
+        _build_optimizer(g_opt, gen)
+        _build_optimizer(d_opt, disc)
+        live = _state(gen, disc, g_opt, d_opt)
+        self.step, self.epoch = live["step"], live["epoch"]
+        self.ckpt = tf.train.Checkpoint(**live)
+
+        self.write = write
+        self._pairs, writer = [], self.ckpt
+        if async_save and write:
+            shadow = self._shadow(live)
+            if shadow is not None:
+                writer = tf.train.Checkpoint(**shadow)
+                self._pairs = [(s, v) for k in live for s, v in zip(_variables_of(shadow[k]), _variables_of(live[k]))]
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint") if self._pairs else None
+        self._pending: Optional[Future] = None
+
+        self.last = tf.train.CheckpointManager(writer, str(self.directory / "last"), max_to_keep=max(1, keep_last))
+        self.best = (tf.train.CheckpointManager(writer, str(self.directory / "best"), max_to_keep=keep_best)
+                     if keep_best > 0 else None)
+        self._best_file = self.directory / "best.json"
+        self.best_metric: Optional[float] = None
+        self._counters_file = self.directory / "counters.json"
+        self.counters: dict = {}
+        if self._best_file.exists():
+            self.best_metric = json.loads(self._best_file.read_text(encoding="utf-8"))["metric"]
+
+    @staticmethod
+    def _shadow(live: dict) -> Optional[dict]:
+        """Clone models and optimizers for snapshots; None (synchronous saves) if the
+        clone's variables do not line up with the live ones.
+        """
+        try:
+            gen = tf.keras.models.clone_model(live["gen"])
+            disc = tf.keras.models.clone_model(live["disc"])
+            g_opt = live["g_opt"].__class__.from_config(live["g_opt"].get_config())
+            d_opt = live["d_opt"].__class__.from_config(live["d_opt"].get_config())
+            _build_optimizer(g_opt, gen)
+            _build_optimizer(d_opt, disc)
+            shadow = _state(gen, disc, g_opt, d_opt)
+            for k in live:
+                a, b = _variables_of(live[k]), _variables_of(shadow[k])
+                if len(a) != len(b) or any(x.shape != y.shape for x, y in zip(a, b)):
+                    raise ValueError(f"{k} variables differ from their clone")
+            return shadow
+        except Exception as e:
+            print(f"⚠️ Cannot snapshot training state ({e}), checkpointing synchronously")
+            return None
+
+    @property
+    def latest(self) -> Optional[str]:
+        return tf.train.latest_checkpoint(str(self.directory / "last"))
+
+    def restore(self, path: Optional[str] = None) -> int:
+        """Restore `path` (default: the latest save). Returns the epoch to resume
+        from, 0 when there is nothing to restore.
+        """
+        self.wait()
+        path = path or self.latest
+        if not path:
+            return 0
+        self.ckpt.restore(path).assert_existing_objects_matched()
+        print(f"[INFO] Restored {path} (epoch {int(self.epoch)}, step {int(self.step)})")
+        if self._counters_file.exists():
+            saved = json.loads(self._counters_file.read_text(encoding="utf-8"))
+            if saved.pop("epoch", None) == int(self.epoch):
+                self.counters = saved
+        return int(self.epoch)
+
+    def improves(self, metric: Optional[float]) -> bool:
+        """Whether saving with `metric` would enter best/ (lower is better)."""
+        return (self.best is not None and metric is not None
+                and (self.best_metric is None or metric < self.best_metric))
+
+    def save(self, epoch: int, metric: Optional[float] = None, counters: Optional[dict] = None):
+        """Checkpoint the state after `epoch` epochs. If `metric` (lower is better)
+        improves on the best so far, the state is also kept under best/. `counters`
+        (JSON-serializable run totals) are written with the checkpoint.
+        """
+        self.epoch.assign(epoch)
+        best = self.improves(metric)
+        if best:
+            self.best_metric = float(metric)
+        if not self.write:
+            return
+        if self._pool is None:
+            self._write(epoch, metric if best else None, counters)
+            return
+        self.wait()  # the shadow is reused, so the previous write must be done
+        for shadow, var in self._pairs:
+            shadow.assign(var)
+        self._pending = self._pool.submit(self._write, epoch, metric if best else None, counters)
+
+    def _write(self, epoch: int, best_metric: Optional[float], counters: Optional[dict] = None):
+        self.last.save(checkpoint_number=epoch)
+        if counters is not None:
+            self._counters_file.write_text(json.dumps(dict(counters, epoch=epoch), indent=2), encoding="utf-8")
+        if best_metric is not None:
+            path = self.best.save(checkpoint_number=epoch)
+            self._best_file.write_text(json.dumps({"epoch": epoch, "metric": best_metric,
+                                                   "checkpoint": path}, indent=2), encoding="utf-8")
+
+    def wait(self):
+        """Block until the pending background write is on disk; re-raises its error."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.result()
+
+
+# Example Usage
+# ckpt = TrainingCheckpoint(gan, g_opt, d_opt, save_dir / "checkpoints", keep_last=3)
+# start = ckpt.restore()          # 0 on a fresh run
+# for epoch in range(start, epochs):
+#     ...
+#     ckpt.step.assign_add(steps)
+#     ckpt.save(epoch + 1, metric=kid, counters=dict(clips=clips))
+# ckpt.wait()
@@ -0,0 +1,22 @@
+import numpy as np
+
+# Tensor contract: clips travel as uint8 (B, T, H, W, 3) in [0, 255]. The models work
+# in float [-1, 1] (generator output is tanh); these two helpers are the only place
+# the two ranges are converted.
+
+
+def to_model_range(x):
+    """uint8 [0, 255] tensor/array -> float32 tensor in [-1, 1] (run inside the model step)."""
+    import tensorflow as tf  # lazily, so to_uint8 users (frame-bank serving) stay TF-free
+    return tf.cast(x, tf.float32) / 127.5 - 1.0
+
+
+def to_uint8(x) -> np.ndarray:
+    """Model output in [-1, 1] (tensor or array) -> uint8 array in [0, 255].
+
+    uint8 input is returned unchanged, so already converted frames pass through.
+    """
+    x = np.asarray(x)
+    if x.dtype == np.uint8:
+        return x
+    return np.clip(np.rint((x.astype(np.float32) + 1.0) * 127.5), 0, 255).astype(np.uint8)
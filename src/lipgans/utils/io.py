@@ -1,7 +1,7 @@
 from pathlib import Path
 import matplotlib.pyplot as plt
-import tensorflow as tf
 from ..config import Config
+from .image import to_uint8
 
 def _next_frame_index(save_dir: Path) -> int:
     """Get the next frame index based on existing saved frames."""
@@ -13,33 +13,32 @@ def _next_frame_index(save_dir: Path) -> int:
 
 def save_frames_and_models(gan, epoch: int, save_dir: Path, cfg: Config, save_full_model: bool = True):
     """
-    Save sample frames and model/weights for a given epoch.
+    Save sample frames and, optionally, the generator for a given epoch.
+
+    Training state (both models, optimizers, step) is checkpointed separately by
+    lipgans.utils.checkpoint.TrainingCheckpoint; this only writes what inference
+    and eyeballing need.
 
     Args:
-        gan: GAN object containing `gen` and `disc`.
+        gan: GAN object containing `gen`, `disc` and `sample()`.
         epoch: Current epoch number.
         save_dir: Directory to save frames and models.
         cfg: Config object with `train.z_dim` and `train.target_frames`.
-        save_full_model: If True, save the full Keras models (can be large).
+        save_full_model: If True, export generator_epoch_<epoch>.model.keras (loaded by
+            lipgans.generate.merge_gans.load_gan_model).
     """
     save_dir.mkdir(parents=True, exist_ok=True)
 
     # Generate a sample clip
-    z = tf.random.normal([1, cfg.train.z_dim])
-    clip = gan.gen(z, training=False).numpy()[0]  # shape: [T,H,W,3]
+    clip = to_uint8(gan.sample(1))[0]  # shape: [T,H,W,3]
 
     # Save frames
     next_idx = _next_frame_index(save_dir)
     for i in range(cfg.train.target_frames):
-        frame = ((clip[i] + 1.0) * 127.5).astype('uint8')
+        frame = clip[i]
         path = save_dir / f"epoch_{epoch:03d}_frame_{next_idx + i}.png"
         plt.imsave(path.as_posix(), frame)
 
-    # Save weights
-    gan.gen.save_weights((save_dir / f"generator_epoch_{epoch}.weights.h5").as_posix())
-    gan.disc.save_weights((save_dir / f"discriminator_epoch_{epoch}.weights.h5").as_posix())
-
-    # Optionally save full models
+    # Export the generator for inference
     if save_full_model:
         gan.gen.save((save_dir / f"generator_epoch_{epoch}.model.keras").as_posix())
-        gan.disc.save((save_dir / f"discriminator_epoch_{epoch}.model.keras").as_posix()
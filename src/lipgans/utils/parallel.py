@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one task run by `map_isolated`."""
+    item: Any
+    value: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    traceback: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_isolated(fn: Callable, item) -> TaskResult:
+    t0 = time.perf_counter()
+    try:
+        return TaskResult(item, value=fn(item), elapsed=time.perf_counter() - t0)
+    except Exception as e:
+        return TaskResult(item, error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - t0,
+                          traceback=traceback.format_exc())
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """0 or None means one worker per CPU core."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def map_isolated(fn: Callable, items: Iterable, workers: int = 1,
+                 initializer: Optional[Callable] = None, initargs: tuple = (),
+                 start_method: Optional[str] = None) -> Iterator[TaskResult]:
+    """
+    Run `fn(item)` for every item and yield a TaskResult as each one finishes.
+
+    An exception in one task is captured in its TaskResult instead of aborting the
+    run. With workers > 1 tasks run in a process pool (in completion order), so
+    `fn` and `initializer` must be picklable module-level functions. `start_method`
+    ("spawn", "fork", ...) selects the multiprocessing context; use "spawn" when
+    workers run TensorFlow.
+    """
+    items = list(items)
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield _run_isolated(fn, item)
+        return
+
+    ctx = multiprocessing.get_context(start_method) if start_method else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=initializer, initargs=initargs) as ex:
+        futures = {ex.submit(_run_isolated, fn, item): item for item in items}
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception as e:  # worker process died (e.g. segfault in a native decoder)
+                yield TaskResult(futures[fut], error=f"{type(e).__name__}: {e}")
@@ -0,0 +1,42 @@
+import tensorflow as tf
+
+POLICIES = ("float32", "mixed_float16", "mixed_bfloat16")
+
+
+def set_policy(name: str = "float32"):
+    """Set the global Keras dtype policy. Must be called before the models are built."""
+    if name not in POLICIES:
+        raise ValueError(f"Unknown precision policy '{name}', expected one of {POLICIES}")
+    tf.keras.mixed_precision.set_global_policy(name)
+
+
+def make_optimizer(lr: float, policy: str = "float32"):
+    """Adam, wrapped in a dynamic LossScaleOptimizer under mixed_float16.
+    bfloat16 has float32's exponent range and needs no loss scaling.
+    """
+    opt = tf.keras.optimizers.Adam(lr)
+    if policy == "mixed_float16":
+        opt = tf.keras.mixed_precision.LossScaleOptimizer(opt)
+    return opt
+
+
+def scale_loss(opt, loss):
+    """Multiply loss by the optimizer's current loss scale (identity without scaling)."""
+    if hasattr(opt, "get_scaled_loss"):  # Keras 2 LossScaleOptimizer
+        return opt.get_scaled_loss(loss)
+    if hasattr(opt, "scale_loss"):  # Keras 3
+        return opt.scale_loss(loss)
+    return loss
+
+
+def unscale_gradients(opt, grads):
+    """Undo scale_loss on gradients. Keras 3 optimizers unscale inside apply_gradients."""
+    if hasattr(opt, "get_unscaled_gradients"):  # Keras 2 LossScaleOptimizer
+        return opt.get_unscaled_gradients(grads)
+    return grads
+
+
+# Example Usage
+# set_policy("mixed_float16")
+# gan = VisemeGAN(...)
+# g_opt = make_optimizer(1e-4, "mixed_float16")
@@ -0,0 +1,141 @@
+import json
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import tensorflow as tf
+
+
+class TrainingTelemetry:
+    """
+    Per-step timing for a training loop: time blocked on the input pipeline versus
+    time in the train step, clips/s and epoch wall time.
+
+    Records go to TensorBoard scalars (<log_dir>/<run>/) and to <log_dir>/<run>.jsonl,
+    one JSON object per line with "type" "step" (every `log_every` steps) or "epoch".
+    With `profile_steps` > 0, a tf.profiler trace covers global steps
+    [profile_start, profile_start + profile_steps) and is viewable in TensorBoard.
+
+        for real in tel.batches(ds):
+            g_loss, d_loss = gan.train_step(real, g_opt, d_opt)
+            tel.step_done(real, g_loss, d_loss)
+        stats = tel.end_epoch(epoch)
+    """
+
+    def __init__(self, log_dir: Path, run: str, log_every: int = 10, tensorboard: bool = True,
+                 jsonl: bool = True, profile_start: int = 0, profile_steps: int = 0, start_step: int = 0):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.run = run
+        self.log_every = max(1, log_every)
+        self.step = start_step
+        self._writer = None
+        if tensorboard:
+            try:
+                import tensorboard  # noqa: F401  (tf.summary needs it, TF does not depend on it)
+                self._writer = tf.summary.create_file_writer(str(self.log_dir / run))
+            except ImportError:
+                print("⚠️ tensorboard is not installed, writing telemetry to JSONL only")
+        self._jsonl = open(self.log_dir / f"{run}.jsonl", "a", encoding="utf-8") if jsonl else None
+        self._profile = (profile_start, profile_start + profile_steps) if profile_steps > 0 else None
+        self._profiling = False
+        self._step_t0 = 0.0
+        self._data_s = 0.0
+        self._reset_epoch()
+
+    def _reset_epoch(self):
+        self._epoch_t0 = time.perf_counter()
+        self._epoch = dict(steps=0, clips=0, data_s=0.0, step_s=0.0)
+
+    def batches(self, data: Iterable, limit: Optional[int] = None) -> Iterator:
+        """Iterate `data` (up to `limit` batches), timing each wait for the next batch."""
+        it = iter(data)
+        n = 0
+        if self._epoch["steps"] == 0:  # epoch wall time excludes work done between epochs
+            self._epoch_t0 = time.perf_counter()
+        while limit is None or n < limit:
+            t0 = time.perf_counter()
+            try:
+                batch = next(it)
+            except StopIteration:
+                return
+            self._data_s = time.perf_counter() - t0
+            self._maybe_profile()
+            self._step_t0 = time.perf_counter()
+            yield batch
+            n += 1
+
+    def step_done(self, batch, g_loss, d_loss, clips: Optional[int] = None):
+        """Close the step opened by `batches`. Reading the losses waits for the step to finish.
+        `clips` overrides the batch size read from `batch` (e.g. for distributed batches).
+        """
+        g, d = float(g_loss), float(d_loss)
+        step_s = time.perf_counter() - self._step_t0
+        if clips is None:
+            clips = int((batch[0] if isinstance(batch, (tuple, list)) else batch).shape[0])
+        e = self._epoch
+        e["steps"] += 1
+        e["clips"] += clips
+        e["data_s"] += self._data_s
+        e["step_s"] += step_s
+        self.step += 1
+        if self.step % self.log_every == 0:
+            total = self._data_s + step_s
+            self.record("step", dict(data_wait_ms=self._data_s * 1e3, step_ms=step_s * 1e3,
+                                    clips_per_s=clips / max(total, 1e-9), g_loss=g, d_loss=d))
+
+    def end_epoch(self, epoch: int) -> dict:
+        """Record and return the epoch totals (wall time, clips/s, share of time waiting on data)."""
+        e = self._epoch
+        wall = time.perf_counter() - self._epoch_t0
+        stats = dict(epoch=epoch, steps=e["steps"], clips=e["clips"], epoch_s=wall,
+                     clips_per_s=e["clips"] / max(wall, 1e-9),
+                     data_wait_s=e["data_s"], step_s=e["step_s"],
+                     data_wait_frac=e["data_s"] / max(e["data_s"] + e["step_s"], 1e-9))
+        self.record("epoch", stats)
+        self._reset_epoch()
+        return stats
+
+    def record(self, kind: str, values: dict):
+        """Write scalar `values` at the current step, as JSONL type `kind` and TensorBoard tags kind/<name>."""
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(dict(type=kind, run=self.run, step=self.step, time=time.time(),
+                                              **{k: round(v, 6) if isinstance(v, float) else v
+                                                 for k, v in values.items()})) + "\n")
+            self._jsonl.flush()
+        if self._writer is not None:
+            with self._writer.as_default(step=self.step):
+                for k, v in values.items():
+                    if k != "epoch":
+                        tf.summary.scalar(f"{kind}/{k}", v)
+
+    def _maybe_profile(self):
+        if self._profile is None:
+            return
+        start, stop = self._profile
+        if not self._profiling and start <= self.step < stop:
+            tf.profiler.experimental.start(str(self.log_dir / self.run))
+            self._profiling = True
+        elif self._profiling and self.step >= stop:
+            tf.profiler.experimental.stop()
+            self._profiling = False
+            self._profile = None
+
+    def close(self):
+        if self._profiling:
+            tf.profiler.experimental.stop()
+            self._profiling = False
+        if self._writer is not None:
+            self._writer.flush()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+# Example Usage
+# tel = TrainingTelemetry(Path("models/logs"), "01_Closed_Lips", log_every=10, profile_start=20, profile_steps=5)
+# for epoch in range(epochs):
+#     for real in tel.batches(ds):
+#         g_loss, d_loss = gan.train_step(real, g_opt, d_opt)
+#         tel.step_done(real, g_loss, d_loss)
+#     print(tel.end_epoch(epoch + 1))
+# tel.close()
@@ -1,6 +1,79 @@
+import io
+import os
+import tempfile
 from pathlib import Path
+from typing import Iterable, Optional, Union
 import cv2
+import numpy as np
 import re
+from PIL import Image
+
+from .image import to_uint8
+
+Frames = Union[np.ndarray, Iterable[np.ndarray]]
+
+
+def _clip(frames: Frames) -> np.ndarray:
+    """(N, H, W, 3) uint8 clip from an array or iterable of frames (uint8 or [-1, 1] float)."""
+    clip = to_uint8(frames if isinstance(frames, np.ndarray) else [to_uint8(f) for f in frames])
+    if clip.ndim != 4 or len(clip) == 0:
+        raise ValueError(f"Expected a non-empty (N, H, W, 3) clip, got shape {clip.shape}")
+    return clip
+
+
+def _write(data: bytes, path: Optional[Path]) -> bytes:
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_bytes(data)
+    return data
+
+
+def encode_gif(frames: Frames, fps: int = 25, path: Optional[Path] = None, colors: int = 256) -> bytes:
+    """
+    Encode frames (RGB) as a looping GIF in memory; also written to `path` if given.
+
+    The palette is computed once per clip, from a strip of up to 16 of its frames
+    spread evenly over the clip, and every frame is mapped onto it without
+    dithering, so colours do not flicker between frames.
+    """
+    clip = _clip(frames)
+    picks = np.linspace(0, len(clip) - 1, min(16, len(clip))).astype(int)
+    strip = Image.fromarray(np.concatenate(clip[picks], axis=0))
+    palette = strip.quantize(colors, method=Image.Quantize.MEDIANCUT)
+    images = [Image.fromarray(f).quantize(palette=palette, dither=Image.Dither.NONE) for f in clip]
+    buf = io.BytesIO()
+    images[0].save(buf, format="GIF", save_all=True, append_images=images[1:],
+                   duration=round(1000 / fps), loop=0)
+    return _write(buf.getvalue(), path)
+
+
+def encode_mp4(frames: Frames, fps: int = 25, path: Optional[Path] = None) -> bytes:
+    """
+    Encode frames (RGB) as an MP4 in memory; also written to `path` if given.
+
+    H.264 through imageio's pyav plugin (`pip install imageio[pyav]`; plays in
+    browsers) when installed, otherwise MPEG-4 Part 2 through OpenCV, which can only
+    write to a file and goes through a temporary one. Encoding errors of the pyav
+    path are raised, not papered over with the fallback.
+    """
+    clip = _clip(frames)
+    try:
+        import imageio.v3 as iio
+        data = iio.imwrite("<bytes>", clip, extension=".mp4", plugin="pyav", fps=fps, codec="libx264")
+    except ImportError:  # imageio or its pyav plugin not installed
+        fd, tmp = tempfile.mkstemp(suffix=".mp4")
+        os.close(fd)
+        try:
+            h, w = clip.shape[1:3]
+            video = cv2.VideoWriter(tmp, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+            for frame in clip:
+                video.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+            video.release()
+            data = Path(tmp).read_bytes()
+        finally:
+            os.unlink(tmp)
+    return _write(data, path)
+
 
 def frames_to_video(frames_dir: Path, out_path: Path, fps: int = 30) -> bool:
     """
@@ -24,18 +97,20 @@ def frames_to_video(frames_dir: Path, out_path: Path, fps: int = 30) -> bool:
         return False
     h, w = first.shape[:2]
 
-    # Initialize video writer
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out = cv2.VideoWriter(str(out_path), fourcc, fps, (w, h))
-
-    # Write frames
+    frames = []
     for p in imgs:
         frame = cv2.imread(str(p))
         if frame is None:
             continue  # skip missing/corrupt frames
         if frame.shape[:2] != (h, w):
             frame = cv2.resize(frame, (w, h))
-        out.write(frame)
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
 
-    out.release()
+    encode_mp4(np.stack(frames), fps=fps, path=out_path)
     return True
+
+
+# Example Usage
+# clip = np.concatenate(list(generate_text("Hello, world.", cfg)))   # (N, H, W, 3) uint8
+# gif_bytes = encode_gif(clip, fps=25)
+# encode_mp4(clip, fps=25, path=Path("out/hello.mp4"))
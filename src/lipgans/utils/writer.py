@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import List, Tuple
+import cv2
+
+
+class ImageWriter:
+    """
+    PNG writer that encodes and writes frames on a thread pool.
+
+    `write` returns as soon as the frame is queued, so decoding is not stalled by PNG
+    compression or filesystem latency. At most `max_pending` frames are in flight;
+    beyond that `write` blocks (backpressure) so memory stays bounded. Errors are
+    collected and raised as one IOError from `flush()` / `close()`.
+
+    Frames must not be modified after being passed to `write`.
+    """
+
+    def __init__(self, threads: int = 4, max_pending: int = 64, png_compression: int = 1):
+        self.png_params = [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+        self.written = 0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="png-writer")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._errors: List[Tuple[Path, Exception]] = []
+        self._closed = False
+
+    def write(self, path, img):
+        """Queue `img` (BGR uint8) to be written to `path` as PNG."""
+        if self._closed:
+            raise RuntimeError("ImageWriter is closed")
+        self._slots.acquire()
+        fut = self._pool.submit(self._write, Path(path), img)
+        with self._lock:
+            self._pending.add(fut)
+        fut.add_done_callback(self._done)
+
+    def _write(self, path: Path, img):
+        try:
+            ok, buf = cv2.imencode(".png", img, self.png_params)
+            if not ok:
+                raise IOError("PNG encoding failed")
+            path.write_bytes(buf.tobytes())
+            with self._lock:
+                self.written += 1
+        except Exception as e:
+            with self._lock:
+                self._errors.append((path, e))
+
+    def _done(self, fut):
+        with self._lock:
+            self._pending.discard(fut)
+        self._slots.release()
+
+    def flush(self):
+        """Block until every queued frame is written; raise IOError if any write failed since the last flush."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            path, err = errors[0]
+            raise IOError(f"{len(errors)} frame(s) failed to write; first: {path}: {err}")
+
+    def close(self):
+        """Flush, stop the worker threads and report errors."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:  # don't mask the original exception with write errors
+            try:
+                self.close()
+            except IOError:
+                pass
+
+
+# Example Usage
+# with ImageWriter(threads=8, max_pending=128, png_compression=3) as writer:
+#     for i, frame in enumerate(frames):
+#         writer.write(out_dir / f"{i:04d}.png", frame)